@@ -0,0 +1,131 @@
+# #######################################################
+# Pluggable PWM actuator backends
+# - rpi:    RPi.GPIO software PWM
+# - pigpio: hardware PWM through the pigpio daemon
+# - sim:    no hardware, writes are dropped (any Linux box)
+# - Every backend can record duty / frequency changes with
+#   timestamps once record() is called (bench_motor.py)
+# #######################################################
+
+import time
+
+
+class Actuator:
+    def __init__(self, pin, freq):
+        self.pin = pin
+        self.freq = freq
+        self.duty = 0
+        self.log = None
+        self._clock = time.perf_counter
+
+    # ------------------------
+    # RECORDING
+    # ------------------------
+    def record(self, clock=time.perf_counter):
+        # Log entries: (time after the write returned, duty, freq)
+        self.log = []
+        self._clock = clock
+
+    def _recorded(self):
+        if self.log is not None:
+            self.log.append((self._clock(), self.duty, self.freq))
+
+    # ------------------------
+    # OUTPUT
+    # ------------------------
+    def set_duty(self, duty):
+        self._write_duty(duty)
+        self.duty = duty
+        self._recorded()
+
+    def set_frequency(self, freq):
+        self._write_frequency(freq)
+        self.freq = freq
+        self._recorded()
+
+    def close(self):
+        pass
+
+    def _write_duty(self, duty):
+        raise NotImplementedError
+
+    def _write_frequency(self, freq):
+        raise NotImplementedError
+
+
+class RPiGPIOActuator(Actuator):
+    def __init__(self, pin, freq):
+        import RPi.GPIO as GPIO
+
+        super().__init__(pin, freq)
+        self.gpio = GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.OUT)
+        self.pwm = GPIO.PWM(pin, freq)
+        self.pwm.start(0)
+
+    def _write_duty(self, duty):
+        self.pwm.ChangeDutyCycle(duty)
+
+    def _write_frequency(self, freq):
+        self.pwm.ChangeFrequency(freq)
+
+    def close(self):
+        self.pwm.stop()
+        self.gpio.cleanup(self.pin)
+
+
+class PigpioActuator(Actuator):
+    # Hardware PWM: only GPIO 12, 13, 18 and 19; needs `sudo pigpiod`
+    def __init__(self, pin, freq):
+        import pigpio
+
+        super().__init__(pin, freq)
+        self.pi = pigpio.pi()
+        if not self.pi.connected:
+            raise RuntimeError("pigpio daemon is not running (start it with `sudo pigpiod`)")
+        self._apply()
+
+    def _apply(self):
+        # Frequency and duty always go out together (duty in millionths)
+        self.pi.hardware_PWM(self.pin, int(self.freq), int(self.duty * 10000))
+
+    def _write_duty(self, duty):
+        self.duty = duty
+        self._apply()
+
+    def _write_frequency(self, freq):
+        self.freq = freq
+        self._apply()
+
+    def close(self):
+        self.pi.hardware_PWM(self.pin, 0, 0)
+        self.pi.stop()
+
+
+class SimulatedActuator(Actuator):
+    # Writes go nowhere; call record() to keep them (bench_motor.py does)
+    def _write_duty(self, duty):
+        pass
+
+    def _write_frequency(self, freq):
+        pass
+
+
+BACKENDS = {
+    "rpi": RPiGPIOActuator,
+    "pigpio": PigpioActuator,
+    "sim": SimulatedActuator,
+}
+
+
+def open_actuator(backend, pin, freq):
+    if backend != "auto":
+        return BACKENDS[backend](pin, freq)
+
+    # RPi.GPIO raises RuntimeError when imported off a Pi
+    try:
+        return RPiGPIOActuator(pin, freq)
+    except (ImportError, RuntimeError) as e:
+        print(f"No GPIO available ({e}); using the simulated motor")
+        return SimulatedActuator(pin, freq)
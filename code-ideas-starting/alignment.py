@@ -0,0 +1,193 @@
+# #######################################################
+# Transcript alignment from cached word timings
+# - No Whisper pass: works from stored word_data + edited text
+# - Token diff on normalized words
+# - Fuzzy / phonetic matching inside changed regions
+# - Inserted words placed between neighbouring anchors,
+#   spread along the audio energy envelope when available
+# #######################################################
+
+import difflib
+import functools
+import re
+
+import numpy as np
+
+import audio_loader
+
+
+FUZZY_RATIO = 0.75       # SequenceMatcher ratio that counts as "same word"
+MIN_WORD_DURATION = 0.08
+DEFAULT_WORD_DURATION = 0.25
+ENVELOPE_SR = 16000      # the view speech recognition already cached
+ENVELOPE_HOP = 256       # 16 ms frames
+
+
+# ------------------------
+# TOKENS
+# ------------------------
+def normalize(word):
+    return re.sub(r"[^\w']", "", word.lower()).strip("'")
+
+
+_SOUNDEX_CODES = {}
+for _letters, _code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"),
+                        ("l", "4"), ("mn", "5"), ("r", "6")):
+    for _ch in _letters:
+        _SOUNDEX_CODES[_ch] = _code
+
+
+def phonetic_key(word):
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return ""
+
+    key = word[0]
+    last = _SOUNDEX_CODES.get(word[0], "")
+    for ch in word[1:]:
+        code = _SOUNDEX_CODES.get(ch, "")
+        if code and code != last:
+            key += code
+        if ch not in "hw":
+            last = code
+    return (key + "000")[:4]
+
+
+def words_match(a, b):
+    if not a or not b:
+        return False
+    if a == b:
+        return True
+    if phonetic_key(a) == phonetic_key(b):
+        return True
+    return difflib.SequenceMatcher(None, a, b).ratio() >= FUZZY_RATIO
+
+
+# ------------------------
+# ENERGY ENVELOPE
+# ------------------------
+@functools.lru_cache(maxsize=4)
+def energy_envelope(audio_path):
+    import librosa
+
+    y, sr = audio_loader.load(audio_path, ENVELOPE_SR)
+    rms = librosa.feature.rms(y=y, hop_length=ENVELOPE_HOP)[0]
+    times = librosa.frames_to_time(np.arange(len(rms)), sr=sr, hop_length=ENVELOPE_HOP)
+    return times, rms
+
+
+def _split_by_energy(start, end, count, envelope):
+    # Word boundaries where cumulative energy crosses k/count, so sung
+    # words land on loud stretches rather than in the gaps between them.
+    times, rms = envelope
+    lo, hi = np.searchsorted(times, [start, end])
+    if hi - lo < 2 or float(rms[lo:hi].sum()) <= 0:
+        return np.linspace(start, end, count + 1)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(rms[lo:hi], dtype=np.float64)))
+    cumulative /= cumulative[-1]
+    grid = np.concatenate(([start], times[lo + 1:hi], [end]))
+
+    bounds = np.interp(np.linspace(0.0, 1.0, count + 1), cumulative, grid)
+    bounds[0], bounds[-1] = start, end
+    return bounds
+
+
+# ------------------------
+# ALIGN
+# ------------------------
+def _anchor_words(cached_tokens, edited_tokens):
+    # anchors[j] = index into cached words whose timing edited word j keeps
+    anchors = [None] * len(edited_tokens)
+    matcher = difflib.SequenceMatcher(None, cached_tokens, edited_tokens, autojunk=False)
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                anchors[j] = i
+
+        elif tag == "replace":
+            # Monotonic greedy pairing so "gonna" keeps the timing of "gona"
+            i = i1
+            for j in range(j1, j2):
+                for k in range(i, i2):
+                    if words_match(cached_tokens[k], edited_tokens[j]):
+                        anchors[j] = k
+                        i = k + 1
+                        break
+
+    return anchors
+
+
+def align_words(word_data, edited_text, audio_path=None):
+    edited_words = edited_text.split()
+    word_data = word_data or []
+
+    cached_tokens = [normalize(w["word"]) for w in word_data]
+    edited_tokens = [normalize(w) for w in edited_words]
+    anchors = _anchor_words(cached_tokens, edited_tokens)
+
+    aligned = [None] * len(edited_words)
+    for j, i in enumerate(anchors):
+        if i is not None:
+            aligned[j] = {
+                "start": float(word_data[i]["start"]),
+                "end": float(word_data[i]["end"]),
+                "word": edited_words[j]
+            }
+
+    envelope = None
+    j = 0
+    while j < len(edited_words):
+        if aligned[j] is not None:
+            j += 1
+            continue
+
+        run_start = j
+        while j < len(edited_words) and aligned[j] is None:
+            j += 1
+        count = j - run_start
+
+        prev_word = aligned[run_start - 1] if run_start > 0 else None
+        next_word = aligned[j] if j < len(edited_words) else None
+
+        if next_word is not None:
+            end = next_word["start"]
+            if prev_word is not None:
+                start = min(prev_word["end"], end)
+            else:
+                # Words sung before the first anchor end where it starts
+                start = max(0.0, end - count * DEFAULT_WORD_DURATION)
+        else:
+            if prev_word is not None:
+                start = prev_word["end"]
+            elif word_data:
+                start = float(word_data[0]["start"])
+            else:
+                start = 0.0
+            tail = float(word_data[-1]["end"]) if word_data else start
+            end = max(tail, start + count * DEFAULT_WORD_DURATION)
+
+        # No room between the neighbours: borrow the second half of the
+        # previous word rather than stacking zero-length words. The run
+        # never reaches past the next anchor, so times stay in order.
+        if end - start < count * MIN_WORD_DURATION and prev_word is not None:
+            start = (prev_word["start"] + min(prev_word["end"], end)) / 2
+            prev_word["end"] = start
+
+        if audio_path is not None and envelope is None:
+            envelope = energy_envelope(audio_path)
+
+        if envelope is not None:
+            bounds = _split_by_energy(start, end, count, envelope)
+        else:
+            bounds = np.linspace(start, end, count + 1)
+
+        for k in range(count):
+            aligned[run_start + k] = {
+                "start": float(bounds[k]),
+                "end": float(bounds[k + 1]),
+                "word": edited_words[run_start + k]
+            }
+
+    return aligned
@@ -0,0 +1,58 @@
+# #######################################################
+# Song analysis shared by the player and prepare.py
+# - Speech recognition through the configured backend
+# - Melody extraction (pitch presets, see pitch.py)
+# - Note compilation, cached next to the melody
+# - No UI imports: headless batch jobs run without tkinter
+# #######################################################
+
+import asr_backends
+import metrics
+import notes
+import pitch
+from melody_store import Melody
+from storage import save_notes, load_notes
+
+
+# ------------------------
+# CONFIG
+# ------------------------
+MODEL_SIZE = "base"
+ASR_BACKEND = "whisper"  # or "faster-whisper" (int8, much faster on a Pi)
+ASR_VAD = False          # skip silent / quiet stretches before transcribing
+NOTE_PARAMS = dict(notes.DEFAULT_PARAMS)
+PITCH_MODE = "fast"      # see pitch.PRESETS
+
+
+# ------------------------
+# SPEECH RECOGNITION
+# ------------------------
+def run_asr(audio_path, backend=None, vad=None):
+    # (text, words) from the configured backend, see asr_backends.py
+    asr = asr_backends.get_backend(backend or ASR_BACKEND, MODEL_SIZE)
+    return asr_backends.transcribe(audio_path, asr, vad=ASR_VAD if vad is None else vad)
+
+
+# ------------------------
+# MELODY EXTRACTION
+# ------------------------
+def extract_melody(audio_path, mode=None, **overrides):
+    # Decode and pitch tracking are timed inside audio_loader / pitch
+    config = pitch.pitch_config(mode or PITCH_MODE, **overrides)
+    frame_times, f0 = pitch.extract_pitch(audio_path, config)
+    return Melody.from_frames(frame_times, f0)
+
+
+# ------------------------
+# NOTES
+# ------------------------
+def get_notes(file_hash, melody_data, params=None):
+    params = params or NOTE_PARAMS
+    key = notes.params_key(params)
+    note_data = load_notes(file_hash, key)
+    metrics.cache("notes", note_data is not None)
+    if note_data is None:
+        with metrics.timer("compile_notes"):
+            note_data = notes.compile_notes(melody_data, params)
+        save_notes(file_hash, note_data, key)
+    return note_data
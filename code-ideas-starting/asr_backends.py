@@ -0,0 +1,256 @@
+# #######################################################
+# Speech recognition backends
+# - whisper:        openai-whisper (default, unchanged results)
+# - faster-whisper: CTranslate2 int8 inference for CPU-only devices
+# - Energy-based voice-activity pre-pass: silent / quiet stretches
+#   are cut out and only the remaining regions are transcribed
+# - Streaming mode: audio cut into overlapping chunks at quiet points,
+#   transcribed in order on a worker pool, results handed out per chunk
+# - Every backend returns (text, words) with words as
+#   {"start", "end", "word"} in song time
+# #######################################################
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import model_manager
+import audio_loader
+import metrics
+
+
+SAMPLE_RATE = 16000       # what every Whisper variant expects
+
+VAD_FRAME = 0.03          # seconds per energy frame
+VAD_THRESHOLD_DB = -30.0  # frames this far below the loud (p95) level are silence
+VAD_FLOOR = 1e-3          # absolute RMS floor for near-silent files
+VAD_MIN_GAP = 2.0         # shorter pauses stay inside one region
+VAD_PAD = 0.3             # seconds kept on both sides of each region
+VAD_MIN_REGION = 0.5
+
+STREAM_FIRST_CHUNK = 10.0 # short first chunk, so the first lyrics show up quickly
+STREAM_CHUNK = 30.0       # target length of the chunks after that
+STREAM_SEARCH = 5.0       # cut at the quietest frame this far before the target
+STREAM_OVERLAP = 1.0      # context each chunk borrows from its neighbours
+STREAM_WORKERS = 2
+
+
+def extract_words(result):
+    words = []
+    for segment in result["segments"]:
+        for word in segment.get("words", []):
+            words.append({
+                "start": word["start"],
+                "end": word["end"],
+                "word": word["word"].strip()
+            })
+    return words
+
+
+# ------------------------
+# BACKENDS
+# ------------------------
+class WhisperBackend:
+    name = "whisper"
+    # openai-whisper hooks its kv-cache into the shared model on every call,
+    # so chunks of one model must run one at a time
+    parallel = False
+
+    def __init__(self, size="base", device=None):
+        self.size = size
+        self.device = device
+
+    def load(self):
+        return model_manager.get_model(self.size, self.device, backend=self.name)
+
+    def transcribe(self, audio):
+        result = self.load().transcribe(audio, word_timestamps=True)
+        return result["text"].strip(), extract_words(result)
+
+
+class FasterWhisperBackend:
+    name = "faster-whisper"
+    parallel = True
+
+    def __init__(self, size="base", device="cpu", beam_size=1):
+        self.size = size
+        self.device = device
+        # Greedy decoding, like openai-whisper's default transcribe()
+        self.beam_size = beam_size
+
+    def load(self):
+        return model_manager.get_model(self.size, self.device, backend=self.name)
+
+    def transcribe(self, audio):
+        segments, _ = self.load().transcribe(audio, word_timestamps=True, beam_size=self.beam_size)
+        texts = []
+        words = []
+        for segment in segments:  # a generator: decoding happens here
+            texts.append(segment.text.strip())
+            for word in segment.words or []:
+                words.append({"start": word.start, "end": word.end, "word": word.word.strip()})
+        return " ".join(texts), words
+
+
+BACKENDS = {
+    "whisper": WhisperBackend,
+    "faster-whisper": FasterWhisperBackend,
+}
+
+
+def get_backend(name="whisper", size="base", device=None):
+    backend = BACKENDS[name]
+    return backend(size) if device is None else backend(size, device)
+
+
+# ------------------------
+# VOICE ACTIVITY
+# ------------------------
+def frame_rms(audio, hop):
+    frames = len(audio) // hop
+    return np.sqrt(np.mean(np.square(audio[:frames * hop].reshape(frames, hop)), axis=1))
+
+
+def speech_regions(audio, sr=SAMPLE_RATE):
+    # (start, end) sample ranges worth transcribing
+    hop = int(VAD_FRAME * sr)
+    rms = frame_rms(audio, hop)
+    if not len(rms):
+        return []
+
+    threshold = max(VAD_FLOOR, np.percentile(rms, 95) * 10 ** (VAD_THRESHOLD_DB / 20))
+    active = np.flatnonzero(rms > threshold)
+    if not len(active):
+        return []
+
+    # Runs of active frames, bridged across pauses shorter than VAD_MIN_GAP
+    breaks = np.flatnonzero(np.diff(active) * VAD_FRAME > VAD_MIN_GAP)
+    starts = np.r_[active[0], active[breaks + 1]]
+    ends = np.r_[active[breaks], active[-1]] + 1
+
+    pad = int(VAD_PAD * sr)
+    regions = []
+    for start, end in zip(starts * hop, ends * hop):
+        if (end - start) / sr < VAD_MIN_REGION:
+            continue
+        start, end = max(0, start - pad), min(len(audio), end + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+# ------------------------
+# CHUNKS
+# ------------------------
+def chunk_bounds(audio, sr=SAMPLE_RATE):
+    # (start, end) sample ranges covering the song, cut at quiet frames
+    hop = int(VAD_FRAME * sr)
+    rms = frame_rms(audio, hop)
+
+    cuts = [0]
+    target = STREAM_FIRST_CHUNK
+    while len(audio) - cuts[-1] > (target + STREAM_SEARCH) * sr:
+        hi = (cuts[-1] + int(target * sr)) // hop
+        lo = max(cuts[-1] // hop + 1, hi - int(STREAM_SEARCH / VAD_FRAME))
+        cuts.append((lo + int(np.argmin(rms[lo:hi]))) * hop + hop // 2)
+        target = STREAM_CHUNK
+    cuts.append(len(audio))
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _transcribe_span(backend, audio, start, end, vad):
+    # Words of audio[start:end] in song time; with vad only its speech regions
+    spans = [(start, end)]
+    if vad:
+        spans = [(start + lo, start + hi) for lo, hi in speech_regions(audio[start:end])]
+
+    texts = []
+    words = []
+    for lo, hi in spans:
+        text, region_words = backend.transcribe(audio[lo:hi])
+        offset = lo / SAMPLE_RATE
+        texts.append(text)
+        words.extend(
+            {"start": w["start"] + offset, "end": w["end"] + offset, "word": w["word"]}
+            for w in region_words
+        )
+    return " ".join(t for t in texts if t), words
+
+
+def _transcribe_chunk(backend, audio, start, end, vad):
+    # Decoded with some overlap for context; only words starting inside
+    # [start, end) are kept, so neighbouring chunks never repeat a word
+    pad = int(STREAM_OVERLAP * SAMPLE_RATE)
+    with metrics.timer("asr_chunk", backend=backend.name):
+        _, words = _transcribe_span(backend, audio, max(0, start - pad), min(len(audio), end + pad), vad)
+    lo, hi = start / SAMPLE_RATE, end / SAMPLE_RATE
+    return [w for w in words if lo <= w["start"] < hi and w["word"]]
+
+
+class StreamingTranscription:
+    # start() decodes the song and submits its chunks in order; iterate for
+    # (start, end, future) per chunk, each future giving that chunk's words
+    def __init__(self, audio_path, backend=None, vad=False, since=0.0, workers=STREAM_WORKERS):
+        self.audio_path = audio_path
+        self.backend = backend or WhisperBackend()
+        self.vad = vad
+        self.since = since
+        self.workers = workers if self.backend.parallel else 1
+
+        self.duration = None
+        self.chunks = []
+        self.futures = []
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        audio = load_audio(self.audio_path)
+        chunks = [
+            (start / SAMPLE_RATE, end / SAMPLE_RATE, start, end)
+            for start, end in chunk_bounds(audio)
+            if end / SAMPLE_RATE > self.since
+        ]
+
+        with self._lock:
+            if self._cancelled:
+                return self
+            self.duration = len(audio) / SAMPLE_RATE
+            self.chunks = chunks
+            pool = ThreadPoolExecutor(max_workers=self.workers)
+            self.futures = [
+                pool.submit(_transcribe_chunk, self.backend, audio, start, end, self.vad)
+                for _, _, start, end in chunks
+            ]
+            pool.shutdown(wait=False)
+        return self
+
+    def __iter__(self):
+        for (start, end, _, _), future in zip(self.chunks, self.futures):
+            yield start, end, future
+
+    def cancel(self):
+        # Chunks not started yet are dropped; one already running finishes
+        with self._lock:
+            self._cancelled = True
+            for future in self.futures:
+                future.cancel()
+
+
+# ------------------------
+# TRANSCRIBE
+# ------------------------
+def load_audio(audio_path):
+    audio, _ = audio_loader.load(audio_path, SAMPLE_RATE)
+    return audio
+
+
+def transcribe(audio_path, backend=None, vad=False):
+    backend = backend or WhisperBackend()
+    audio = load_audio(audio_path)
+    with metrics.timer("asr", backend=backend.name):
+        if not vad:
+            return backend.transcribe(audio)
+        return _transcribe_span(backend, audio, 0, len(audio), vad)
@@ -0,0 +1,158 @@
+# #######################################################
+# Shared decoded audio
+# - Each song is decoded once (mono, native rate) and the PCM is kept
+#   by content hash in a small in-memory LRU while it is being analysed;
+#   callers forget() it once their analysis is done
+# - Resampled views (16 kHz for speech recognition and analysis) are
+#   derived from that PCM; only the rates in DISK_RATES are written as
+#   .npy under pcm_cache/, oldest-used files evicted past DISK_CACHE_BYTES
+# - Disk copies are memory-mapped on load, so a cached song costs no
+#   decode at all
+# #######################################################
+
+import os
+import glob
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+from fingerprint import get_file_hash
+
+
+CACHE_DIR = "pcm_cache"       # next to transcripts.db; safe to delete
+DISK_CACHE = True
+DISK_RATES = (16000,)         # views persisted; native PCM stays in memory
+DISK_CACHE_BYTES = 2 << 30    # ~2 GB, roughly 9 hours of 16 kHz audio
+MEMORY_ITEMS = 4              # (song, rate) views kept in memory
+
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+# ------------------------
+# DISK
+# ------------------------
+def _view_path(file_hash, sr):
+    return os.path.join(CACHE_DIR, f"{file_hash}-{sr}.npy")
+
+
+def _evict():
+    # Least recently used first (mtime is bumped on every hit)
+    entries = []
+    for path in glob.glob(os.path.join(CACHE_DIR, "*.npy")):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue  # removed by another process meanwhile
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= DISK_CACHE_BYTES:
+            break
+        try:
+            os.remove(path)  # a reader that already mapped it keeps its copy
+        except OSError:
+            continue
+        total -= size
+
+
+def _save(path, y):
+    if not DISK_CACHE:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write-then-rename so a concurrent reader never maps half a file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, y)
+    os.replace(tmp, path)
+    _evict()
+
+
+def _load(path):
+    if not DISK_CACHE or not os.path.exists(path):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for _evict
+        return np.load(path, mmap_mode="r")
+    except OSError:
+        return None  # evicted between the check and the load
+
+
+# ------------------------
+# DECODE
+# ------------------------
+def _decode(audio_path):
+    import librosa
+    y, sr = librosa.load(audio_path, sr=None, mono=True)
+    return y.astype(np.float32), sr
+
+
+def _native(audio_path, file_hash):
+    key = (file_hash, None)
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+
+    with metrics.timer("decode"):
+        native = _decode(audio_path)
+    _remember(key, native)
+    return native
+
+
+def _remember(key, value):
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_ITEMS:
+        _memory.popitem(last=False)
+
+
+# ------------------------
+# PUBLIC
+# ------------------------
+def load(audio_path, sr=None, file_hash=None):
+    # (mono float32 PCM, sample rate); sr=None keeps the file's own rate.
+    # Returned arrays are shared, treat them as read-only.
+    file_hash = file_hash or get_file_hash(audio_path)
+    key = (file_hash, sr)
+
+    with _lock:
+        metrics.cache("pcm_memory", key in _memory)
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+        persisted = sr in DISK_RATES
+        y = _load(_view_path(file_hash, sr)) if persisted else None
+        if persisted:
+            metrics.cache("pcm_disk", y is not None)
+        if y is None:
+            y, native_sr = _native(audio_path, file_hash)
+            if sr is None or sr == native_sr:
+                return y, native_sr
+            import librosa
+            with metrics.timer("resample", sr=sr):
+                y = librosa.resample(y, orig_sr=native_sr, target_sr=sr).astype(np.float32)
+            if persisted:
+                _save(_view_path(file_hash, sr), y)
+
+        _remember(key, (y, sr))
+        return y, sr
+
+
+def is_cached(file_hash, sr=None):
+    if (file_hash, sr) in _memory:
+        return True
+    return DISK_CACHE and sr in DISK_RATES and os.path.exists(_view_path(file_hash, sr))
+
+
+def forget(file_hash=None):
+    # Drop in-memory PCM (all of it, or one song's); disk copies stay.
+    # Called once a song's analysis is done, so playback holds no PCM.
+    with _lock:
+        for key in list(_memory):
+            if file_hash is None or key[0] == file_hash:
+                del _memory[key]
@@ -0,0 +1,252 @@
+# #######################################################
+# Streaming audio playback
+# - sounddevice.OutputStream callback pulls one block at a time
+# - WAV files are memory-mapped, never fully loaded
+# - MP3 and friends decoded block-by-block (soundfile, ffmpeg fallback)
+# - Sample-accurate playback clock from the device's DAC time
+# - Can start mid-file (sessions resume / seek by reopening)
+# - output="null": blocks pulled in real time and discarded, for
+#   headless benchmarks (no sound card / PortAudio needed)
+# #######################################################
+
+import subprocess
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import scipy.io.wavfile as wav
+
+
+BLOCK_SIZE = 1024
+FFMPEG_SAMPLERATE = 44100
+FFMPEG_CHANNELS = 2
+
+
+def to_float32(block):
+    if block.dtype == np.float32:
+        return block
+    if block.dtype == np.int16:
+        return block.astype(np.float32) / 32768.0
+    if block.dtype == np.int32:
+        return block.astype(np.float32) / 2147483648.0
+    if block.dtype == np.uint8:
+        return (block.astype(np.float32) - 128.0) / 128.0
+    return block.astype(np.float32)
+
+
+# ------------------------
+# SOURCES
+# ------------------------
+class WavSource:
+    def __init__(self, path):
+        self.samplerate, data = wav.read(path, mmap=True)
+        self.data = data.reshape(len(data), -1)
+        self.channels = self.data.shape[1]
+        self.frames = len(self.data)
+        self.pos = 0
+
+    def read(self, frames):
+        block = self.data[self.pos:self.pos + frames]
+        self.pos += len(block)
+        return to_float32(np.asarray(block))
+
+    def seek(self, frame):
+        self.pos = max(0, min(int(frame), self.frames))
+
+    def close(self):
+        self.data = None
+
+
+class DecoderSource:
+    def __init__(self, path):
+        import soundfile as sf
+
+        self.file = sf.SoundFile(path)
+        self.samplerate = self.file.samplerate
+        self.channels = self.file.channels
+        self.frames = self.file.frames
+
+    def read(self, frames):
+        return self.file.read(frames, dtype="float32", always_2d=True)
+
+    def seek(self, frame):
+        self.file.seek(max(0, min(int(frame), self.frames)))
+
+    def close(self):
+        self.file.close()
+
+
+class FfmpegSource:
+    # Last resort for formats the local libsndfile can't decode.
+    def __init__(self, path):
+        self.path = path
+        self.samplerate = FFMPEG_SAMPLERATE
+        self.channels = FFMPEG_CHANNELS
+        self.frames = None
+        self.proc = None
+        self.seek(0)
+
+    def read(self, frames):
+        raw = self.proc.stdout.read(frames * self.channels * 4)
+        return np.frombuffer(raw, dtype=np.float32).reshape(-1, self.channels)
+
+    def seek(self, frame):
+        self.close()
+        self.proc = subprocess.Popen(
+            [
+                "ffmpeg", "-v", "quiet",
+                "-ss", f"{max(0, frame) / self.samplerate:.6f}",
+                "-i", self.path,
+                "-f", "f32le", "-ac", str(self.channels), "-ar", str(self.samplerate),
+                "-"
+            ],
+            stdout=subprocess.PIPE
+        )
+
+    def close(self):
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+
+def open_source(path):
+    if path.lower().endswith(".wav"):
+        try:
+            return WavSource(path)
+        except ValueError:
+            pass  # e.g. 24-bit PCM, which scipy can't memory-map
+    try:
+        return DecoderSource(path)
+    except Exception:
+        return FfmpegSource(path)
+
+
+# ------------------------
+# OUTPUTS
+# ------------------------
+class CallbackStop(Exception):
+    pass
+
+
+class NullOutputStream:
+    # The parts of sounddevice.OutputStream that AudioStream uses; a thread
+    # calls back once per block period on the perf_counter clock.
+    def __init__(self, samplerate, channels, dtype, blocksize, device, callback, finished_callback):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.callback = callback
+        self.finished_callback = finished_callback
+        self.latency = blocksize / samplerate
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def time(self):
+        return time.perf_counter()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        period = self.blocksize / self.samplerate
+        outdata = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        due = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                info = SimpleNamespace(outputBufferDacTime=due + self.latency)
+                try:
+                    self.callback(outdata, self.blocksize, info, None)
+                except CallbackStop:
+                    break
+                due += period
+                self._stop.wait(max(0.0, due - time.perf_counter()))
+        finally:
+            self.finished_callback()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+
+def open_output(output):
+    # (stream class, exception that ends playback from the callback)
+    if output == "null":
+        return NullOutputStream, CallbackStop
+    import sounddevice as sd
+    return sd.OutputStream, sd.CallbackStop
+
+
+# ------------------------
+# STREAM
+# ------------------------
+class AudioStream:
+    def __init__(self, path, blocksize=BLOCK_SIZE, device=None, start=0.0, output="device"):
+        self.source = open_source(path)
+        self.samplerate = self.source.samplerate
+        self.channels = self.source.channels
+
+        # Frames count from the start of the file, so position() is song time
+        self.start_frame = int(start * self.samplerate)
+        if self.start_frame:
+            self.source.seek(self.start_frame)
+        self.frames_written = self.start_frame
+        # (frame index, DAC time) of the most recent block handed to the device
+        self._anchor = None
+        self.finished = threading.Event()
+        self.first_block = threading.Event()  # set once audio is on its way out
+
+        stream_class, self._callback_stop = open_output(output)
+        self.stream = stream_class(
+            samplerate=self.samplerate,
+            channels=self.channels,
+            dtype="float32",
+            blocksize=blocksize,
+            device=device,
+            callback=self._callback,
+            finished_callback=self.finished.set
+        )
+
+    def _callback(self, outdata, frames, time_info, status):
+        block = self.source.read(frames)
+        n = len(block)
+        outdata[:n] = block
+        outdata[n:] = 0
+
+        # Some host APIs report a zero DAC time; estimate it from latency.
+        dac_time = time_info.outputBufferDacTime or (self.stream.time + self.stream.latency)
+        self._anchor = (self.frames_written, dac_time)
+        self.frames_written += n
+        self.first_block.set()
+
+        if n < frames:
+            raise self._callback_stop
+
+    def start(self):
+        self.stream.start()
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def stop(self):
+        self.stream.stop()
+
+    def close(self):
+        self.stream.close()
+        self.source.close()
+
+    # Seconds of audio that have actually reached the speaker.
+    def position(self):
+        anchor = self._anchor
+        if anchor is None:
+            return self.start_frame / self.samplerate
+        frame, dac_time = anchor
+        played = frame + (self.stream.time - dac_time) * self.samplerate
+        return max(self.start_frame, min(played, self.frames_written)) / self.samplerate
@@ -0,0 +1,124 @@
+# #######################################################
+# Speech recognition benchmark
+# - Runs each backend (with / without the VAD pre-pass) on the clips
+# - Speed: wall time and real-time factor, model load timed apart
+# - Accuracy vs. the reference words (cached in transcripts.db when
+#   available, otherwise the first configuration): word match rate
+#   and word start-time error
+#
+#   python bench_asr.py [--configs whisper faster-whisper+vad] [--json results.json] [clips...]
+# #######################################################
+
+import os
+import glob
+import json
+import time
+import argparse
+from difflib import SequenceMatcher
+
+import numpy as np
+
+import asr_backends
+from alignment import normalize
+from fingerprint import get_file_hash
+from storage import init_db, load_words
+
+
+MP3_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mp3")
+DEFAULT_CONFIGS = ["whisper", "whisper+vad", "faster-whisper", "faster-whisper+vad"]
+
+
+def parse_config(config):
+    name, _, extra = config.partition("+")
+    return name, extra == "vad"
+
+
+def compare(ref_words, words):
+    ref_tokens = [normalize(w["word"]) for w in ref_words]
+    tokens = [normalize(w["word"]) for w in words]
+    matcher = SequenceMatcher(None, ref_tokens, tokens, autojunk=False)
+
+    errors = []
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            errors.append(abs(words[block.b + k]["start"] - ref_words[block.a + k]["start"]))
+
+    errors = np.array(errors)
+    return {
+        "word_match_rate": len(errors) / len(ref_tokens) if ref_tokens else None,
+        "start_error_ms_median": float(1000 * np.median(errors)) if len(errors) else None,
+        "start_error_ms_p90": float(1000 * np.percentile(errors, 90)) if len(errors) else None,
+    }
+
+
+def bench_clip(path, configs, size):
+    duration = len(asr_backends.load_audio(path)) / asr_backends.SAMPLE_RATE
+    ref_words = load_words(get_file_hash(path)) or None
+
+    results = {}
+    for config in configs:
+        name, vad = parse_config(config)
+        backend = asr_backends.get_backend(name, size)
+
+        start = time.perf_counter()
+        backend.load()
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, words = asr_backends.transcribe(path, backend, vad=vad)
+        elapsed = time.perf_counter() - start
+
+        entry = {
+            "seconds": elapsed,
+            "load_seconds": load_seconds,
+            "realtime_factor": elapsed / duration,
+            "words": len(words),
+        }
+        if ref_words is None:
+            ref_words = words  # nothing cached: the first configuration is the reference
+        else:
+            entry.update(compare(ref_words, words))
+        results[config] = entry
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare speech recognition backends")
+    parser.add_argument("clips", nargs="*")
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS,
+                        help="backend names, '+vad' adds the voice-activity pre-pass")
+    parser.add_argument("--size", default="base")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    init_db()
+    clips = args.clips or sorted(glob.glob(os.path.join(MP3_DIR, "*.*")))
+
+    report = {}
+    for path in clips:
+        name = os.path.basename(path)
+        report[name] = bench_clip(path, args.configs, args.size)
+
+        print(name)
+        for config, entry in report[name].items():
+            line = (
+                f"  {config:<20} {entry['seconds']:7.2f}s  (load {entry['load_seconds']:5.2f}s)"
+                f"  RTF {entry['realtime_factor']:5.2f}  {entry['words']:4d} words"
+            )
+            if entry.get("word_match_rate") is not None:
+                line += f"  match {100 * entry['word_match_rate']:5.1f}%"
+            if entry.get("start_error_ms_median") is not None:
+                line += (
+                    f"  start err median {entry['start_error_ms_median']:6.1f}ms"
+                    f" / p90 {entry['start_error_ms_p90']:6.1f}ms"
+                )
+            print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
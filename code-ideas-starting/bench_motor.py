@@ -0,0 +1,208 @@
+# #######################################################
+# Motor timing benchmark (runs on any Linux box)
+# - Plays haptic timelines against a wall clock, no audio device
+# - notes:  lyric_player.play_melody_on_motor on cached songs
+# - haptic: HapticMusicPlayer beat + melody timelines on the clips
+# - The actuator records every duty / frequency write; each write
+#   is matched to its timeline deadline
+# - Reports jitter, missed deadlines and PWM call rate
+# - --output wave: same timelines as DMA pulse trains (waveform.py);
+#   reports refills, underruns and Python time per audio second
+#
+#   python bench_motor.py [--backend sim] [--output events|wave] [--seconds 20] [--json results.json]
+# #######################################################
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+
+import lyric_player
+from haptics import HapticTimeline
+from motor_control import init_motor, stop_motor, MotorOutput, BACKEND_CHOICES
+from notes import Notes
+from scheduler import PlaybackScheduler, WallClock
+from storage import init_db, fetch_all, load_melody, load_words
+import waveform
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "testing"))
+from HapticMusicPlayer import HapticMusicPlayer
+
+
+MP3_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mp3")
+DEADLINE_MS = 5.0  # one haptics.RESOLUTION step
+
+
+# ------------------------
+# ANALYSIS
+# ------------------------
+def write_lateness(timeline, log):
+    # Walk the write log in order: a timeline point is met by the first
+    # write that leaves the motor in exactly that point's state.
+    duties = np.clip(timeline.duties, 0, 100).tolist()
+    freqs = np.clip(timeline.freqs, 20, 2000).tolist()
+    lateness = []
+    unmatched = 0
+    j = 0
+    for at, duty, freq in zip(timeline.times.tolist(), duties, freqs):
+        while j < len(log) and (log[j][1], log[j][2]) != (duty, freq):
+            j += 1
+        if j == len(log):
+            unmatched += 1
+            continue
+        lateness.append(log[j][0] - at)
+    return np.array(lateness), unmatched
+
+
+def summarize(timeline, log, scheduler, deadline_ms):
+    lateness, unmatched = write_lateness(timeline, log)
+    ms = 1000 * lateness
+    span = log[-1][0] - log[0][0] if len(log) > 1 else 0.0
+    return {
+        "points": len(timeline),
+        "writes": len(log),
+        "unmatched": unmatched,
+        "call_rate_hz": len(log) / span if span > 0 else None,
+        "lateness_ms_mean": float(ms.mean()) if len(ms) else None,
+        "lateness_ms_p95": float(np.percentile(ms, 95)) if len(ms) else None,
+        "lateness_ms_max": float(ms.max()) if len(ms) else None,
+        "jitter_ms": float(ms.std()) if len(ms) else None,
+        "missed_deadlines": int((ms > deadline_ms).sum()) + unmatched,
+        "scheduler": scheduler.report().get("motor", {"count": 0}),
+    }
+
+
+def run(scheduler, clock, pwm):
+    pwm.record(clock)
+    clock.begin()
+    scheduler.start()
+    scheduler.join()
+
+
+def run_wave(timeline, pwm):
+    if not waveform.supports_waves(pwm):
+        return None
+    player = waveform.WavePlayer(timeline, waveform.wave_driver(pwm), pwm.pin)
+    player.start()
+    time.sleep(player.end)
+    player.stop()
+    return player.report()
+
+
+def truncate(timeline, seconds):
+    keep = timeline.times < seconds
+    return HapticTimeline(timeline.times[keep], timeline.duties[keep], timeline.freqs[keep])
+
+
+# ------------------------
+# SCENARIOS
+# ------------------------
+def bench_notes(file_hash, backend, output, seconds, deadline_ms):
+    melody = load_melody(file_hash)
+    if melody is None:
+        return None
+    note_data = lyric_player.get_notes(file_hash, melody)
+    keep = note_data.onsets < seconds
+    note_data = Notes(note_data.onsets[keep], note_data.durations[keep], note_data.freqs[keep])
+    word_data = load_words(file_hash, end=seconds)
+    timeline = lyric_player.motor_timeline(note_data, word_data)
+
+    lyric_player.ACTUATOR = backend
+    if output == "wave":
+        pwm = init_motor(base_freq=lyric_player.MOTOR_BASE_FREQ, backend=backend)
+        try:
+            return run_wave(timeline, pwm)
+        finally:
+            stop_motor(pwm)
+
+    clock = WallClock()
+    scheduler = PlaybackScheduler(clock)
+    pwm = lyric_player.play_melody_on_motor(note_data, scheduler, word_data)
+    if pwm is None:
+        return None
+    run(scheduler, clock, pwm)
+    return summarize(timeline, pwm.log, scheduler, deadline_ms)
+
+
+def bench_haptic(path, backend, output, seconds, deadline_ms):
+    player = HapticMusicPlayer(path, actuator=backend)
+    timeline = truncate(player.timeline, seconds)
+    if output == "wave":
+        try:
+            return run_wave(timeline, player.pwm)
+        finally:
+            player.stop()
+
+    clock = WallClock()
+    scheduler = PlaybackScheduler(clock)
+    timeline.schedule(scheduler, MotorOutput(player.pwm))
+    scheduler.on_finish(player.stop)
+    run(scheduler, clock, player.pwm)
+    return summarize(timeline, player.pwm.log, scheduler, deadline_ms)
+
+
+def print_result(label, entry):
+    if entry is None:
+        print(f"  {label:<10} nothing to play")
+        return
+    if "chunks" in entry:
+        print(
+            f"  {label:<10} {entry['chunks']:5d} chunks  {entry['underruns']} underruns"
+            f"  python {entry['python_ms_per_second']:5.2f}ms per audio second"
+        )
+        return
+    print(
+        f"  {label:<10} {entry['points']:5d} points  {entry['writes']:5d} writes"
+        f"  {entry['call_rate_hz'] or 0:6.1f} calls/s"
+        f"  late mean {entry['lateness_ms_mean'] or 0:5.2f}ms"
+        f"  p95 {entry['lateness_ms_p95'] or 0:5.2f}ms"
+        f"  max {entry['lateness_ms_max'] or 0:6.2f}ms"
+        f"  jitter {entry['jitter_ms'] or 0:5.2f}ms"
+        f"  missed {entry['missed_deadlines']}"
+    )
+
+
+# ------------------------
+# MAIN
+# ------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Measure motor timing for the haptic playback paths")
+    parser.add_argument("clips", nargs="*")
+    parser.add_argument("--backend", choices=BACKEND_CHOICES, default="sim")
+    parser.add_argument("--output", choices=["events", "wave"], default="events")
+    parser.add_argument("--seconds", type=float, default=20.0, help="seconds of each song to play")
+    parser.add_argument("--deadline-ms", type=float, default=DEADLINE_MS)
+    parser.add_argument("--scenarios", nargs="+", choices=["notes", "haptic"], default=["notes", "haptic"])
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    init_db()
+    report = {}
+
+    if "notes" in args.scenarios:
+        for file_hash, filename in fetch_all("SELECT file_hash, filename FROM songs ORDER BY filename"):
+            entry = bench_notes(file_hash, args.backend, args.output, args.seconds, args.deadline_ms)
+            report.setdefault(filename, {})["notes"] = entry
+            print(filename)
+            print_result("notes", entry)
+
+    if "haptic" in args.scenarios:
+        clips = args.clips or sorted(glob.glob(os.path.join(MP3_DIR, "*.*")))
+        for path in clips:
+            name = os.path.basename(path)
+            entry = bench_haptic(path, args.backend, args.output, args.seconds, args.deadline_ms)
+            report.setdefault(name, {})["haptic"] = entry
+            print(name)
+            print_result("haptic", entry)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# #######################################################
+# Pitch extraction benchmark
+# - Runs every pitch preset on the bundled clips
+# - Speed: wall time of resampling + pitch tracking; each clip is
+#   decoded once up front (no pcm_cache), so presets compare fairly
+# - Accuracy vs. the "accurate" preset: voicing agreement,
+#   median cents error, gross (> 50 cent) error rate
+#
+#   python bench_pitch.py [--workers 0] [--json results.json] [clips...]
+# #######################################################
+
+import os
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+
+import pitch
+
+
+MP3_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mp3")
+
+
+def compare(ref_times, ref_f0, times, f0):
+    # Nearest frame of the candidate track for every reference frame
+    idx = np.clip(np.searchsorted(times, ref_times), 0, len(times) - 1)
+    f0 = f0[idx]
+
+    ref_voiced = ~np.isnan(ref_f0)
+    voiced = ~np.isnan(f0)
+    both = ref_voiced & voiced
+
+    cents = np.abs(1200 * np.log2(f0[both] / ref_f0[both])) if both.any() else np.empty(0)
+    return {
+        "voicing_agreement": float((ref_voiced == voiced).mean()),
+        "median_cents": float(np.median(cents)) if len(cents) else None,
+        "gross_error_rate": float((cents > 50).mean()) if len(cents) else None,
+    }
+
+
+def bench_clip(path, presets, workers=None):
+    import librosa
+    y, sr = librosa.load(path, sr=None, mono=True)
+
+    results = {}
+    ref_times = ref_f0 = None
+
+    for name in presets:
+        config = pitch.pitch_config(name)
+        if workers is not None:
+            config["workers"] = workers
+        start = time.perf_counter()
+        times, f0 = pitch.track_pitch(y, sr, config)
+        elapsed = time.perf_counter() - start
+
+        entry = {"seconds": elapsed, "frames": len(f0)}
+        if name == "accurate":
+            ref_times, ref_f0 = times, f0
+        elif ref_times is not None:
+            entry.update(compare(ref_times, ref_f0, times, f0))
+        results[name] = entry
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pitch extraction presets")
+    parser.add_argument("clips", nargs="*")
+    parser.add_argument("--presets", nargs="+", default=["accurate", "fast", "autocorr", "pyin"])
+    parser.add_argument("--workers", type=int, help="override the presets' pool size (0 = one per core)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    clips = args.clips or sorted(glob.glob(os.path.join(MP3_DIR, "*.*")))
+    presets = ["accurate"] + [p for p in args.presets if p != "accurate"]
+
+    report = {}
+    for path in clips:
+        name = os.path.basename(path)
+        report[name] = bench_clip(path, presets, args.workers)
+
+        print(name)
+        for preset, entry in report[name].items():
+            line = f"  {preset:<9} {entry['seconds']:7.2f}s  {entry['frames']:6d} frames"
+            if entry.get("median_cents") is not None:
+                line += (
+                    f"  voicing {100 * entry['voicing_agreement']:5.1f}%"
+                    f"  median {entry['median_cents']:6.1f}c"
+                    f"  gross {100 * entry['gross_error_rate']:5.1f}%"
+                )
+            print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# #######################################################
+# Startup benchmark for cached songs
+# - Each run is a fresh interpreter: import lyric_player, open the
+#   database, load transcript / melody / notes and render the motor
+#   timeline (everything before the first audio block)
+# - Reports import and ready times, peak RSS and which heavy modules
+#   (torch, whisper, librosa, scipy.ndimage) ended up loaded
+# - --eager imports whisper and librosa up front, like the player used
+#   to, for comparison
+#
+#   python bench_startup.py [--runs 5] [--eager] [--json results.json] song.mp3
+# #######################################################
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+import numpy as np
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ["torch", "whisper", "faster_whisper", "librosa", "scipy.ndimage"]
+
+CHILD = """
+import sys, json, time, resource
+start = time.perf_counter()
+sys.path.insert(0, {here!r})
+if {eager!r}:
+    for name in ("whisper", "librosa"):
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+import lyric_player
+from storage import init_db, load_from_db
+from fingerprint import get_file_hash
+from melody_store import Melody
+imported = time.perf_counter()
+
+init_db()
+file_hash = get_file_hash({path!r})
+transcript, word_data, melody_data = load_from_db(file_hash)
+note_data = lyric_player.get_notes(file_hash, melody_data if melody_data is not None else Melody.empty())
+timeline = lyric_player.motor_timeline(note_data, word_data)
+ready = time.perf_counter()
+
+print(json.dumps({{
+    "cached": transcript is not None,
+    "import_seconds": imported - start,
+    "ready_seconds": ready - start,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_once(path, eager):
+    code = CHILD.format(here=HERE, eager=eager, path=os.path.abspath(path), heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench(path, runs, eager):
+    samples = [run_once(path, eager) for _ in range(runs)]
+    return {
+        "cached": samples[0]["cached"],
+        "runs": runs,
+        "import_seconds": float(np.median([s["import_seconds"] for s in samples])),
+        "ready_seconds": float(np.median([s["ready_seconds"] for s in samples])),
+        "peak_rss_mb": float(np.median([s["peak_rss_mb"] for s in samples])),
+        "loaded": samples[-1]["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-ready for a cached song")
+    parser.add_argument("song")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="also measure with whisper / librosa imported up front")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    report = {"lazy": bench(args.song, args.runs, eager=False)}
+    if args.eager:
+        report["eager"] = bench(args.song, args.runs, eager=True)
+
+    if not report["lazy"]["cached"]:
+        print(f"{args.song} is not in the cache yet (run prepare.py first); timings include no analysis.")
+
+    for name, entry in report.items():
+        print(
+            f"{name:<6} import {entry['import_seconds']:6.3f}s  ready {entry['ready_seconds']:6.3f}s"
+            f"  peak RSS {entry['peak_rss_mb']:6.1f} MB  loaded: {', '.join(entry['loaded']) or 'none'}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# #######################################################
+# Playback benchmark suite (headless, reproducible)
+# - Real pipeline on the bundled clips with the null audio output
+#   and the simulated motor: no sound card, no GPIO
+# - lyrics: lyric_player path (hash, DB, ASR, melody, notes, motor)
+# - haptic: HapticMusicPlayer path (beats + melody timeline)
+# - cold: empty transcripts.db / pcm_cache in a scratch directory;
+#   warm: the same directory again, every cache hit
+# - Per run (fresh interpreter): analysis time, time to first sound,
+#   peak RSS, word / motor scheduling jitter, stage timings
+# - --baseline: compare with an earlier results file
+#
+#   python bench_suite.py [--asr whisper|faster-whisper|none] [--seconds 5]
+#                         [--json results.json] [--baseline old.json] [clips...]
+# #######################################################
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import numpy as np
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MP3_DIR = os.path.join(HERE, "..", "mp3")
+DEFAULT_CLIPS = ["ballgame.mp3", "redCard.wav", "sweetCaroline.wav"]
+PIPELINES = ["lyrics", "haptic"]
+
+# Compared against --baseline (lower is better), with the smallest
+# absolute change worth flagging, so run-to-run noise stays quiet
+TRACKED = {
+    "analysis_seconds": 0.05,
+    "time_to_first_sound": 0.05,
+    "peak_rss_mb": 5.0,
+    "jitter_ms": 0.5,
+}
+REGRESSION = 0.10  # flag changes worse than 10%
+
+
+# ------------------------
+# ONE RUN (child process)
+# ------------------------
+def jitter(scheduler):
+    out = {}
+    for kind in ("word", "motor"):
+        stats = scheduler.stats.get(kind)
+        if stats is None or not stats.count:
+            continue
+        ms = 1000 * np.array(stats.samples)
+        out[kind] = {
+            "events": stats.count,
+            "mean_ms": float(ms.mean()),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "max_ms": float(ms.max()),
+            "std_ms": float(ms.std()),
+        }
+    return out
+
+
+def cache_hit(name):
+    import metrics
+    return any(
+        c["name"] == "cache_hits" and c["labels"].get("cache") == name
+        for c in metrics.snapshot()["counters"]
+    )
+
+
+def prepare_lyrics(path, asr):
+    import lyric_player
+    from storage import load_from_db, save_to_db, transcription_progress
+    from fingerprint import get_file_hash
+    from event_index import EventIndex
+    from melody_store import Melody
+    from motor_control import init_motor
+
+    file_hash = get_file_hash(path)
+    transcript, word_data, melody_data = load_from_db(file_hash)
+    cached = transcript is not None and transcription_progress(file_hash) is None
+    if not cached:
+        if asr == "none":
+            transcript, word_data = "", []
+        else:
+            transcript, word_data = lyric_player.run_asr(path, asr)
+        melody_data = lyric_player.extract_melody(path)
+        save_to_db(file_hash, os.path.basename(path), transcript, word_data, melody_data)
+
+    melody_data = melody_data if melody_data is not None else Melody.empty()
+    note_data = lyric_player.get_notes(file_hash, melody_data)
+    words = EventIndex.from_words(word_data)
+
+    pwm = init_motor(base_freq=lyric_player.MOTOR_BASE_FREQ, backend="sim")
+
+    def bind(scheduler, start):
+        # What LyricPlayer.bind_tracks does, minus the Tk widgets
+        scheduler.add_track("word", words, lambda i: None, start, carry=True)
+        lyric_player.play_melody_on_motor(note_data, scheduler, word_data, start, pwm)
+
+    return cached, bind
+
+
+def prepare_haptic(path):
+    from HapticMusicPlayer import HapticMusicPlayer
+
+    player = HapticMusicPlayer(path, actuator="sim", audio_output="null")
+    return cache_hit("haptic_timeline"), player.bind_tracks
+
+
+async def play(path, bind, seconds):
+    from session import PlaybackSession
+
+    schedulers = []
+
+    def capture(scheduler, start):
+        schedulers.append(scheduler)
+        bind(scheduler, start)
+
+    session = PlaybackSession(path, capture, output="null")
+    session.play(0.0)
+    while session.stream is None or not session.stream.first_block.is_set():
+        await asyncio.sleep(0.001)
+    first_sound = time.perf_counter()
+
+    stream = session.stream
+    deadline = first_sound + seconds
+    while time.perf_counter() < deadline and not stream.finished.is_set():
+        await asyncio.sleep(0.01)
+    await session.close()
+    return first_sound, jitter(schedulers[0])
+
+
+def run_one(path, pipeline, asr, seconds):
+    started = time.perf_counter()
+    import resource
+    import metrics
+    from storage import init_db
+
+    if pipeline == "lyrics":
+        import lyric_player  # noqa: F401  (import cost is reported on its own)
+    else:
+        sys.path.insert(0, os.path.join(HERE, "testing"))
+        import HapticMusicPlayer  # noqa: F401
+
+    metrics.enable()
+    init_db()
+    imported = time.perf_counter()
+
+    if pipeline == "lyrics":
+        cached, bind = prepare_lyrics(path, asr)
+    else:
+        cached, bind = prepare_haptic(path)
+    analysed = time.perf_counter()
+
+    first_sound, jitter_stats = asyncio.run(play(path, bind, seconds))
+    snap = metrics.snapshot()
+
+    motor = jitter_stats.get("motor") or jitter_stats.get("word") or {}
+    return {
+        "cached": cached,
+        "import_seconds": imported - started,
+        "analysis_seconds": analysed - imported,
+        "time_to_first_sound": first_sound - started,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "jitter_ms": motor.get("std_ms"),
+        "scheduling": jitter_stats,
+        "stages": {
+            t["name"] + "".join(f"[{v}]" for v in t["labels"].values()): t["seconds"]
+            for t in snap["timers"]
+        },
+    }
+
+
+# ------------------------
+# SUITE
+# ------------------------
+def spawn(path, pipeline, asr, seconds, workdir):
+    # Fresh interpreter per run; cwd holds this run's transcripts.db and pcm_cache
+    out = subprocess.run(
+        [sys.executable, os.path.join(HERE, "bench_suite.py"), "--child", pipeline,
+         "--asr", asr, "--seconds", str(seconds), os.path.abspath(path)],
+        cwd=workdir, capture_output=True, text=True
+    )
+    if out.returncode != 0:
+        raise RuntimeError(f"{pipeline} run on {os.path.basename(path)} failed:\n{out.stderr.strip()}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(report, baseline):
+    lines = []
+    for clip, pipelines in report["clips"].items():
+        for pipeline, runs in pipelines.items():
+            for phase, entry in runs.items():
+                old = baseline.get("clips", {}).get(clip, {}).get(pipeline, {}).get(phase)
+                if not old:
+                    continue
+                for metric, floor in TRACKED.items():
+                    a, b = old.get(metric), entry.get(metric)
+                    if not a or b is None:
+                        continue
+                    change = (b - a) / a
+                    flag = "  REGRESSION" if change > REGRESSION and b - a > floor else ""
+                    lines.append(f"  {clip} {pipeline} {phase} {metric}: {a:.3f} -> {b:.3f} ({100 * change:+.0f}%){flag}")
+    return lines
+
+
+def print_entry(clip, pipeline, phase, entry):
+    jitter_ms = entry["jitter_ms"]
+    print(
+        f"  {clip:<18} {pipeline:<7} {phase:<5} analysis {entry['analysis_seconds']:6.2f}s"
+        f"  first sound {entry['time_to_first_sound']:6.2f}s  peak RSS {entry['peak_rss_mb']:6.1f} MB"
+        + (f"  jitter {jitter_ms:5.2f}ms" if jitter_ms is not None else "  jitter    n/a")
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless cold / warm playback benchmarks")
+    parser.add_argument("clips", nargs="*")
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=PIPELINES)
+    parser.add_argument("--asr", choices=["whisper", "faster-whisper", "none"], default="whisper",
+                        help="'none' skips speech recognition (no model installed)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="playback measured per run")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--child", choices=PIPELINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(args.clips[0], args.child, args.asr, args.seconds)))
+        return
+
+    clips = args.clips or [os.path.join(MP3_DIR, name) for name in DEFAULT_CLIPS]
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "asr": args.asr,
+        "seconds": args.seconds,
+        "clips": {},
+    }
+
+    for path in clips:
+        clip = os.path.basename(path)
+        report["clips"][clip] = {}
+        for pipeline in args.pipelines:
+            with tempfile.TemporaryDirectory(prefix="feeld-bench-") as workdir:
+                runs = {
+                    "cold": spawn(path, pipeline, args.asr, args.seconds, workdir),
+                    "warm": spawn(path, pipeline, args.asr, args.seconds, workdir),
+                }
+            report["clips"][clip][pipeline] = runs
+            for phase, entry in runs.items():
+                print_entry(clip, pipeline, phase, entry)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"vs {args.baseline} ({baseline.get('revision')}):")
+        print("\n".join(compare(report, baseline)) or "  nothing comparable")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# #######################################################
+# Time index over sorted event arrays
+# - Words, notes and haptic change points as one float64 array
+# - Lookups and cue points by binary search (np.searchsorted)
+# #######################################################
+
+import numpy as np
+
+
+class EventIndex:
+    def __init__(self, times):
+        self.times = np.asarray(times, dtype=np.float64)
+
+    @classmethod
+    def from_words(cls, word_data):
+        return cls([w["start"] for w in word_data])
+
+    def __len__(self):
+        return len(self.times)
+
+    def index_at(self, t):
+        # Last event at or before t, -1 before the first one
+        return int(np.searchsorted(self.times, t, side="right")) - 1
+
+    def first_from(self, t):
+        # First event at or after t (len(self) past the end)
+        return int(np.searchsorted(self.times, t, side="left"))
+
+    def window(self, start, end):
+        lo, hi = np.searchsorted(self.times, [start, end])
+        return int(lo), int(hi)
@@ -0,0 +1,87 @@
+# #######################################################
+# File identity cache
+# - (path, size, mtime, inode) -> SHA256, kept in transcripts.db
+# - Full SHA256 only when that metadata changes
+# - Hashing via mmap (buffered 1 MB reads as fallback)
+# - Cheap sampled "quick hash" for duplicate detection
+# #######################################################
+
+import os
+import mmap
+import time
+import hashlib
+
+import metrics
+from storage import fetch_one, fetch_all, transaction
+
+
+READ_BLOCK = 1 << 20       # buffered-read fallback block size
+QUICK_SAMPLE = 64 * 1024   # bytes sampled from start / middle / end
+
+
+# ------------------------
+# HASHES
+# ------------------------
+def sha256_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sha256.update(mapped)
+        except (ValueError, OSError):
+            # Empty files and filesystems that refuse mmap
+            f.seek(0)
+            for block in iter(lambda: f.read(READ_BLOCK), b""):
+                sha256.update(block)
+    return sha256.hexdigest()
+
+
+def quick_hash(path, size=None):
+    # Not a content identity: equal quick hashes only mean "worth comparing"
+    if size is None:
+        size = os.path.getsize(path)
+
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        for offset in (0, max(0, size // 2 - QUICK_SAMPLE // 2), max(0, size - QUICK_SAMPLE)):
+            f.seek(offset)
+            digest.update(f.read(QUICK_SAMPLE))
+    return digest.hexdigest()
+
+
+# ------------------------
+# INDEX
+# ------------------------
+def get_file_hash(filepath):
+    path = os.path.abspath(filepath)
+    st = os.stat(path)
+
+    row = fetch_one("SELECT size, mtime_ns, inode, sha256 FROM file_index WHERE path=?", (path,))
+    hit = bool(row) and tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino)
+    metrics.cache("file_index", hit)
+    if hit:
+        return row[3]
+
+    with metrics.timer("file_hash"):
+        file_hash = sha256_file(path)
+    with transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO file_index VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, st.st_ino, file_hash,
+             quick_hash(path, st.st_size), time.time())
+        )
+    return file_hash
+
+
+def find_duplicates(filepath):
+    # Other indexed files with the same sampled content, confirmed by SHA256
+    path = os.path.abspath(filepath)
+    file_hash = get_file_hash(path)
+
+    rows = fetch_all("""
+        SELECT other.path FROM file_index AS this
+        JOIN file_index AS other
+          ON other.quick_hash = this.quick_hash AND other.path != this.path
+        WHERE this.path = ? AND other.sha256 = ?
+    """, (path, file_hash))
+    return [row[0] for row in rows]
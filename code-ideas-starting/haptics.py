@@ -0,0 +1,172 @@
+# #######################################################
+# Unified haptic renderer
+# - Event tracks (beat, melody, notes, lyric accents) with
+#   priority and attack / release envelopes
+# - Mixed once into a precomputed duty / frequency timeline
+# - Timeline compressed to change points and played from the
+#   single playback scheduler (one real-time loop)
+# - Packed float32 timeline, cached in transcripts.db
+# #######################################################
+
+import math
+
+import numpy as np
+
+from event_index import EventIndex
+
+
+RESOLUTION = 0.005  # seconds per timeline step
+
+
+# ------------------------
+# TRACKS
+# ------------------------
+class HapticTrack:
+    def __init__(self, name, onsets, durations, levels, freqs=None,
+                 priority=0, attack=0.0, release=0.0):
+        self.name = name
+        self.onsets = np.asarray(onsets, dtype=np.float64)
+        self.durations = np.broadcast_to(np.asarray(durations, dtype=np.float64), self.onsets.shape)
+        self.levels = np.broadcast_to(np.asarray(levels, dtype=np.float64), self.onsets.shape)
+        # None: keep the frequency of whatever plays underneath (or the base)
+        self.freqs = None if freqs is None else np.broadcast_to(
+            np.asarray(freqs, dtype=np.float64), self.onsets.shape)
+        self.priority = priority
+        self.attack = attack
+        self.release = release
+
+    def end(self):
+        if not len(self.onsets):
+            return 0.0
+        return float((self.onsets + self.durations).max()) + self.release
+
+
+def beat_track(beat_times, duty, pulse, priority=2, release=0.02):
+    return HapticTrack("beat", beat_times, pulse, duty, priority=priority, release=release)
+
+
+def melody_track(times, duties, priority=1):
+    # Frame-wise curve: each frame holds until the next one
+    times = np.asarray(times, dtype=np.float64)
+    if len(times) > 1:
+        frame = float(np.median(np.diff(times)))
+        durations = np.append(np.diff(times), frame)
+    else:
+        durations = np.full(len(times), RESOLUTION)
+    return HapticTrack("melody", times, durations, duties, priority=priority)
+
+
+def note_track(note_data, duty=50, priority=1):
+    return HapticTrack(
+        "notes", note_data.onsets, note_data.durations, duty,
+        freqs=note_data.freqs, priority=priority
+    )
+
+
+def lyric_track(word_data, duty, pulse=0.04, priority=3):
+    onsets = [w["start"] for w in word_data]
+    return HapticTrack("lyrics", onsets, pulse, duty, priority=priority, release=0.02)
+
+
+# ------------------------
+# TIMELINE
+# ------------------------
+class HapticTimeline:
+    def __init__(self, times, duties, freqs):
+        self.times = np.asarray(times, dtype=np.float32)
+        self.duties = np.asarray(duties, dtype=np.float32)
+        self.freqs = np.asarray(freqs, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.times)
+
+    def to_bytes(self):
+        return np.stack([self.times, self.duties, self.freqs]).astype(np.float32).tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob):
+        packed = np.frombuffer(blob, dtype=np.float32).reshape(3, -1)
+        return cls(packed[0], packed[1], packed[2])
+
+    def schedule(self, scheduler, output, start=0.0):
+        # output: anything with apply(duty, freq), e.g. motor_control.MotorOutput.
+        # Starting mid-song, the point already in effect fires at `start`.
+        duties = self.duties.tolist()
+        freqs = self.freqs.tolist()
+        scheduler.add_track(
+            "motor", EventIndex(self.times),
+            lambda i: output.apply(duties[i], freqs[i]),
+            start, carry=True
+        )
+        return output
+
+
+def _rasterize(track, grid):
+    # Index of the most recent event at every grid step (events are sorted)
+    idx = np.searchsorted(track.onsets, grid, side="right") - 1
+    valid = idx >= 0
+    idx = np.where(valid, idx, 0)
+
+    onsets = track.onsets[idx]
+    ends = onsets + track.durations[idx]
+    since = grid - onsets
+
+    gain = np.ones_like(grid)
+    if track.attack > 0:
+        gain = np.minimum(gain, np.clip(since / track.attack, 0.0, 1.0))
+    if track.release > 0:
+        tail = np.clip(1.0 - (grid - ends) / track.release, 0.0, 1.0)
+        gain = np.where(grid >= ends, tail, gain)
+        active = valid & (grid < ends + track.release)
+    else:
+        active = valid & (grid < ends)
+
+    level = track.levels[idx] * gain
+    held = grid < ends
+    freq = track.freqs[idx] if track.freqs is not None else None
+    return active & (level > 0), held, level, freq
+
+
+def render(tracks, base_freq, duration=None, resolution=RESOLUTION):
+    tracks = [t for t in tracks if len(t.onsets)]
+    if duration is None:
+        duration = max((t.end() for t in tracks), default=0.0)
+
+    steps = int(math.ceil(duration / resolution)) + 1
+    grid = np.arange(steps) * resolution
+    # Sample mid-step so every event lands on its nearest step
+    probe = grid + resolution / 2
+
+    duty = np.zeros(steps)
+    freq = np.full(steps, float(base_freq))
+    owner = np.full(steps, -np.inf)  # priority of the track currently holding each step
+
+    for track in sorted(tracks, key=lambda t: t.priority):
+        active, held, level, track_freq = _rasterize(track, probe)
+        # A held event of higher priority wins outright; releases and equal
+        # priorities only win where they are stronger than what's underneath
+        wins = active & ((held & (track.priority > owner)) | (level > duty))
+        duty[wins] = level[wins]
+        owner[wins] = track.priority
+        if track_freq is not None:
+            freq[wins] = track_freq[wins]
+
+    # Idle motor keeps whatever frequency it last had
+    duty = np.round(duty)
+    freq = np.where(duty > 0, np.round(freq), np.nan)
+    freq = _carry_forward(freq, float(base_freq))
+
+    changed = np.ones(steps, dtype=bool)
+    changed[1:] = (duty[1:] != duty[:-1]) | (freq[1:] != freq[:-1])
+    return HapticTimeline(grid[changed], duty[changed], freq[changed])
+
+
+def _carry_forward(values, first):
+    filled = np.isnan(values)
+    idx = np.where(~filled, np.arange(len(values)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    out = values[idx]
+    # Leading gap before any voiced step
+    head = ~np.maximum.accumulate(~filled)
+    out[head] = first
+    return out
@@ -0,0 +1,224 @@
+# #######################################################
+# Live-input haptics
+# - Microphone / PA feed via sounddevice.InputStream
+# - Streaming pitch (autocorrelation) and onset (spectral flux)
+#   over a bounded look-back buffer
+# - Pitch -> vibration strength, onsets -> beat pulses
+# - Per-block end-to-end latency (ADC -> motor) reporting
+#
+#   python live_input.py --blocksize 256
+# #######################################################
+
+import queue
+import threading
+import time
+import argparse
+from collections import deque
+
+import numpy as np
+import sounddevice as sd
+
+from pitch import autocorr_pitch
+from motor_control import init_motor, set_motor_duty, stop_motor, BACKEND_CHOICES
+
+
+SAMPLERATE = 16000
+BLOCK_SIZE = 256          # 16ms at 16 kHz
+LOOKBACK = 1024           # samples of history analysed per block
+FMIN = 80
+FMAX = 1000
+
+PWM_FREQ = 200
+MIN_DUTY = 20
+MAX_DUTY = 60
+BEAT_DUTY = 75
+BEAT_PULSE = 0.08         # seconds
+ONSET_REFRACTORY = 0.12   # seconds between detected onsets
+ONSET_SENSITIVITY = 1.8   # flux must exceed this times its recent median
+SILENCE_RMS = 0.01
+
+LATENCY_TARGET = 0.050
+STATS_BLOCKS = 1000
+
+
+class LiveHaptics:
+    def __init__(self, samplerate=SAMPLERATE, blocksize=BLOCK_SIZE, device=None, pwm=None):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+
+        self.history = np.zeros(max(LOOKBACK, blocksize), dtype=np.float32)
+        self.window = np.hanning(len(self.history)).astype(np.float32)
+        self.prev_spectrum = None
+        self.flux_history = deque(maxlen=int(1.5 * samplerate / blocksize))
+        self.last_onset = -np.inf
+        self.pulse_until = -np.inf
+        self.duty = None
+
+        self.blocks = queue.Queue(maxsize=8)
+        self.dropped = 0
+        self.latencies = deque(maxlen=STATS_BLOCKS)
+        self.late_blocks = 0
+        self.processed = 0
+
+        self.pwm = pwm or init_motor(base_freq=PWM_FREQ)
+        self._stop = threading.Event()
+        self._worker = None
+
+        self.stream = sd.InputStream(
+            samplerate=samplerate,
+            blocksize=blocksize,
+            channels=1,
+            dtype="float32",
+            device=device,
+            callback=self._callback
+        )
+
+    # ------------------------
+    # CAPTURE
+    # ------------------------
+    def _callback(self, indata, frames, time_info, status):
+        # Time the newest sample of this block reached the ADC
+        adc_time = time_info.inputBufferAdcTime or (self.stream.time - self.stream.latency)
+        captured = adc_time + (frames - 1) / self.samplerate
+        try:
+            self.blocks.put_nowait((indata[:, 0].copy(), captured))
+        except queue.Full:
+            # Falling behind: drop the oldest block, never the newest
+            try:
+                self.blocks.get_nowait()
+            except queue.Empty:
+                pass
+            self.blocks.put_nowait((indata[:, 0].copy(), captured))
+            self.dropped += 1
+
+    # ------------------------
+    # ANALYSIS
+    # ------------------------
+    def _onset(self, now):
+        spectrum = np.abs(np.fft.rfft(self.history * self.window))
+        prev, self.prev_spectrum = self.prev_spectrum, spectrum
+        if prev is None:
+            return False
+
+        flux = float(np.maximum(spectrum - prev, 0.0).sum())
+        threshold = ONSET_SENSITIVITY * (np.median(self.flux_history) if self.flux_history else np.inf)
+        self.flux_history.append(flux)
+
+        if flux > threshold and now - self.last_onset >= ONSET_REFRACTORY:
+            self.last_onset = now
+            return True
+        return False
+
+    def _pitch_duty(self):
+        if np.sqrt(np.mean(self.history ** 2)) < SILENCE_RMS:
+            return 0
+        f0 = autocorr_pitch(self.history[None, :], self.samplerate, FMIN, FMAX)[0]
+        if np.isnan(f0):
+            return MIN_DUTY
+        position = np.log2(f0 / FMIN) / np.log2(FMAX / FMIN)
+        return MIN_DUTY + float(np.clip(position, 0, 1)) * (MAX_DUTY - MIN_DUTY)
+
+    def process(self, block, captured):
+        n = len(block)
+        self.history[:-n] = self.history[n:]
+        self.history[-n:] = block
+
+        now = self.stream.time
+        if self._onset(now):
+            self.pulse_until = now + BEAT_PULSE
+
+        duty = BEAT_DUTY if now < self.pulse_until else self._pitch_duty()
+        duty = int(round(duty))
+        if duty != self.duty:
+            set_motor_duty(self.pwm, duty)
+            self.duty = duty
+
+        latency = self.stream.time - captured
+        self.latencies.append(latency)
+        self.processed += 1
+        if latency > LATENCY_TARGET:
+            self.late_blocks += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                block, captured = self.blocks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.process(block, captured)
+
+    # ------------------------
+    # CONTROL
+    # ------------------------
+    def start(self):
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        self.stream.start()
+
+    def stop(self):
+        self.stream.stop()
+        self.stream.close()
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        stop_motor(self.pwm)
+
+    def report(self):
+        if not self.latencies:
+            return {"blocks": 0, "dropped": self.dropped}
+        ordered = sorted(self.latencies)
+        return {
+            "blocks": self.processed,
+            "dropped": self.dropped,
+            "late_blocks": self.late_blocks,
+            "latency_ms_mean": 1000 * sum(ordered) / len(ordered),
+            "latency_ms_p95": 1000 * ordered[int(0.95 * (len(ordered) - 1))],
+            "latency_ms_max": 1000 * ordered[-1],
+        }
+
+
+def print_report(stats):
+    if not stats["blocks"]:
+        print("No audio blocks processed yet.")
+        return
+    print(
+        f"{stats['blocks']} blocks, latency mean {stats['latency_ms_mean']:.1f}ms / "
+        f"p95 {stats['latency_ms_p95']:.1f}ms / max {stats['latency_ms_max']:.1f}ms, "
+        f"{stats['late_blocks']} over {LATENCY_TARGET * 1000:.0f}ms, {stats['dropped']} dropped"
+    )
+
+
+# ------------------------
+# MAIN
+# ------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Drive the haptic motor from live audio input")
+    parser.add_argument("--device", default=None, help="sounddevice input device name or index")
+    parser.add_argument("--samplerate", type=int, default=SAMPLERATE)
+    parser.add_argument("--blocksize", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run (default: until Ctrl-C)")
+    parser.add_argument("--report-every", type=float, default=5.0)
+    parser.add_argument("--actuator", choices=BACKEND_CHOICES, default="auto")
+    args = parser.parse_args()
+
+    device = int(args.device) if args.device and args.device.isdigit() else args.device
+    pwm = init_motor(base_freq=PWM_FREQ, backend=args.actuator)
+    live = LiveHaptics(args.samplerate, args.blocksize, device, pwm=pwm)
+    live.start()
+    print("Listening... (Ctrl-C to stop)")
+
+    started = time.monotonic()
+    try:
+        while args.duration is None or time.monotonic() - started < args.duration:
+            remaining = None if args.duration is None else args.duration - (time.monotonic() - started)
+            time.sleep(args.report_every if remaining is None else max(0.0, min(args.report_every, remaining)))
+            print_report(live.report())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        live.stop()
+        print_report(live.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,121 +1,78 @@
 # #######################################################
 # Cross-Platform Minimal Lyric + Melody Motor Player
-# - SQLite caching (transcript, word timings, melody)
+# - SQLite caching via storage.py (WAL, migrations, split tables)
+# - File hashes cached by path/size/mtime/inode (fingerprint.py)
 # - Editable transcripts
-# - Re-run Whisper for alignment after edits
-# - Word-level highlighting
-# - Melody extraction (YIN via librosa)
-# - Melody-driven DC motor via Raspberry Pi PWM
-# - Melody visualization in Tkinter
+# - Whisper model loaded once and shared (model_manager), preloaded
+#   only on a cache miss; torch and librosa are only imported when a
+#   song actually needs analysis
+# - Pluggable ASR backends: Whisper or int8 faster-whisper, optional
+#   voice-activity pre-pass (asr_backends.py)
+# - First play streams the transcription: lyrics appear, get saved and
+#   light up chunk by chunk while the song is already playing
+# - Re-align edits from cached word timings (no extra Whisper pass)
+# - Streaming playback (WAV memory-mapped, MP3 decoded per block)
+# - Word-level highlighting, 1-2 lines at a time (lyric_view.py)
+# - One scheduler on the audio clock drives lyrics, motor, visualizer
+# - Playback sessions on an asyncio loop pumped by Tk: pause,
+#   resume, seek, and songs never overlap (session.py)
+# - Cue / scrub to any timestamp via binary-searched event indexes
+# - Melody extraction (configurable pitch presets, see pitch.py)
+# - ASR, melody and note helpers in analysis.py (no UI), shared with
+#   prepare.py
+# - Melody compiled to note events, cached next to the melody
+# - Notes (plus optional lyric accents) mixed into one haptic
+#   timeline (haptics.py) driving the DC motor via PWM
+# - Motor backend selectable: RPi.GPIO, pigpio or simulated;
+#   optional DMA waveform output (waveform.py)
+# - Windowed melody visualization in Tkinter (visualizer.py)
 # #######################################################
 
 # pip install -r requirements.txt --index-url https://download.pytorch.org/whl/cpu
 
 import os
-import hashlib
-import sqlite3
-import json
-import whisper
-import sounddevice as sd
-import numpy as np
-import scipy.io.wavfile as wav
-import threading
-import time
+import asyncio
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import argparse
-import difflib
 
-import librosa
-try:
-    import RPi.GPIO as GPIO
-except ImportError:
-    import fake_rpi_gpio as GPIO
+import model_manager
+import asr_backends
+import metrics
+from session import PlaybackSession, pump_with_tk
+from melody_store import Melody
+from storage import (
+    init_db, save_to_db, load_from_db, save_words, append_words, transcription_progress
+)
+from fingerprint import get_file_hash
+import notes
+import analysis
+from analysis import run_asr, extract_melody, get_notes
+import audio_loader
+from alignment import align_words
+from lyric_view import LyricView
+from event_index import EventIndex
+from visualizer import MelodyVisualizer
+import haptics
+import waveform
+from motor_control import init_motor, motor_off, stop_motor, MotorOutput, BACKEND_CHOICES
 
 
 # ------------------------
 # CONFIG
 # ------------------------
-MODEL_SIZE = "base"
-DB_FILE = "transcripts.db"
+# Speech recognition, pitch and note settings live in analysis.py
+STREAM_ASR = True        # first play starts right away, lyrics fill in per chunk
 WINDOW_SIZE = 600
 FONT_SIZE = 20
 
-MOTOR_PIN = 18  # PWM-capable GPIO pin
-
-
-# ------------------------
-# DATABASE
-# ------------------------
-def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS transcripts (
-            file_hash TEXT PRIMARY KEY,
-            filename TEXT,
-            transcript TEXT,
-            word_data TEXT,
-            melody_data TEXT
-        )
-    """)
-    conn.commit()
-    conn.close()
-
-
-def save_to_db(file_hash, filename, transcript, word_data, melody_data):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?)
-    """, (
-        file_hash,
-        filename,
-        transcript,
-        json.dumps(word_data),
-        json.dumps(melody_data) if melody_data is not None else None
-    ))
-    conn.commit()
-    conn.close()
-
-
-def load_from_db(file_hash):
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT transcript, word_data, melody_data FROM transcripts WHERE file_hash=?",
-        (file_hash,)
-    )
-    row = cursor.fetchone()
-    conn.close()
-    if row:
-        transcript = row[0]
-        word_data = json.loads(row[1]) if row[1] else []
-        melody_data = json.loads(row[2]) if row[2] else None
-        return transcript, word_data, melody_data
-    return None, None, None
-
-
-# ------------------------
-# HASH
-# ------------------------
-def get_file_hash(filepath):
-    sha256 = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        for block in iter(lambda: f.read(4096), b""):
-            sha256.update(block)
-    return sha256.hexdigest()
-
-
-# ------------------------
-# AUDIO
-# ------------------------
-def play_audio(audio_path):
-    samplerate, data = wav.read(audio_path)
-    if data.dtype == np.int16:
-        data = data.astype(np.float32) / 32768.0
-    sd.play(data, samplerate)
-    sd.wait()
+VISUALIZER_INTERVAL = 1 / 60  # seconds between visualizer frames
+SCRUB_SECONDS = 5.0           # arrow-key jump
+MOTOR_BASE_FREQ = 100
+NOTE_DUTY = 50
+LYRIC_ACCENT_DUTY = 0  # > 0 adds a short pulse on every word onset
+ACTUATOR = "auto"      # see actuators.BACKENDS
+MOTOR_MODE = "events"  # "wave": DMA-timed pulse trains on pigpio / sim (waveform.py)
 
 
 # ------------------------
@@ -151,215 +108,89 @@ def review_transcript(original_text):
     return result["text"]
 
 
-# ------------------------
-# ALIGN EDITED TEXT USING FRESH WHISPER RUN
-# ------------------------
-def align_to_edited_text(audio_path, edited_text):
-    model = whisper.load_model(MODEL_SIZE)
-    result = model.transcribe(audio_path, word_timestamps=True)
-
-    whisper_words = []
-    for segment in result["segments"]:
-        for word in segment.get("words", []):
-            whisper_words.append({
-                "start": word["start"],
-                "end": word["end"],
-                "word": word["word"].strip()
-            })
-
-    edited_words = edited_text.split()
-    whisper_word_list = [w["word"] for w in whisper_words]
-
-    matcher = difflib.SequenceMatcher(None, whisper_word_list, edited_words)
-
-    aligned_word_data = []
-    last_end = 0.0
-
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-
-        if tag == "equal":
-            for i, j in zip(range(i1, i2), range(j1, j2)):
-                word_entry = whisper_words[i].copy()
-                word_entry["word"] = edited_words[j]
-                aligned_word_data.append(word_entry)
-                last_end = word_entry["end"]
-
-        elif tag == "replace":
-            if i1 < len(whisper_words):
-                start = whisper_words[i1]["start"]
-                end = whisper_words[i2 - 1]["end"]
-            else:
-                start = last_end
-                end = start + 0.5
-
-            duration = max(end - start, 0.1)
-            step = duration / max(j2 - j1, 1)
-
-            for idx, j in enumerate(range(j1, j2)):
-                new_start = start + idx * step
-                new_end = new_start + step
-                aligned_word_data.append({
-                    "start": new_start,
-                    "end": new_end,
-                    "word": edited_words[j]
-                })
-                last_end = new_end
-
-        elif tag == "insert":
-            step = 0.25
-            for j in range(j1, j2):
-                new_start = last_end
-                new_end = new_start + step
-                aligned_word_data.append({
-                    "start": new_start,
-                    "end": new_end,
-                    "word": edited_words[j]
-                })
-                last_end = new_end
-
-        elif tag == "delete":
-            continue
-
-    return aligned_word_data
-
-
 # ------------------------
 # TRANSCRIBE
 # ------------------------
 def transcribe(audio_path):
-    model = whisper.load_model(MODEL_SIZE)
-    result = model.transcribe(audio_path, word_timestamps=True)
+    text, word_data = run_asr(audio_path)
 
-    edited_text = review_transcript(result["text"])
+    edited_text = review_transcript(text)
 
     if edited_text:
-        word_data = align_to_edited_text(audio_path, edited_text)
+        word_data = align_words(word_data, edited_text, audio_path)
         return edited_text, word_data
 
-    word_data = []
-    for segment in result["segments"]:
-        for word in segment.get("words", []):
-            word_data.append({
-                "start": word["start"],
-                "end": word["end"],
-                "word": word["word"].strip()
-            })
-
-    return result["text"], word_data
-
-
-# ------------------------
-# MELODY EXTRACTION
-# ------------------------
-def extract_melody(audio_path):
-    y, sr = librosa.load(audio_path, sr=None, mono=True)
-
-    f0 = librosa.yin(
-        y,
-        fmin=80,
-        fmax=1000,
-        sr=sr
-    )
-
-    frame_times = librosa.frames_to_time(np.arange(len(f0)), sr=sr)
-
-    melody = []
-    for t, freq in zip(frame_times, f0):
-        if not np.isnan(freq):
-            melody.append({"time": float(t), "freq": float(freq)})
-
-    return melody
+    return text, word_data
 
 
 # ------------------------
 # MOTOR CONTROL (DC MOTOR VIA PWM)
 # ------------------------
-def init_motor():
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setup(MOTOR_PIN, GPIO.OUT)
-    pwm = GPIO.PWM(MOTOR_PIN, 100)  # base frequency
-    pwm.start(0)
+def motor_timeline(note_data, word_data=None):
+    tracks = [haptics.note_track(note_data, NOTE_DUTY)]
+    if LYRIC_ACCENT_DUTY and word_data:
+        tracks.append(haptics.lyric_track(word_data, LYRIC_ACCENT_DUTY))
+    with metrics.timer("haptic_render"):
+        return haptics.render(tracks, MOTOR_BASE_FREQ)
+
+
+def play_melody_on_motor(note_data, scheduler, word_data=None, start=0.0, pwm=None):
+    # pwm: the player's motor, kept across rebinds and only switched off
+    # at the end; without one, a motor is opened and closed for this run
+    timeline = motor_timeline(note_data, word_data)
+    if len(timeline) < 2:
+        return None
+
+    owned = pwm is None
+    if owned:
+        pwm = init_motor(base_freq=MOTOR_BASE_FREQ, backend=ACTUATOR)
+    if MOTOR_MODE == "wave" and waveform.supports_waves(pwm):
+        # One scheduler event starts the DMA queue; the refill thread does the rest
+        player = waveform.WavePlayer(timeline, waveform.wave_driver(pwm), pwm.pin)
+        scheduler.schedule(start, "motor", player.start, start)
+        scheduler.on_finish(player.stop)
+    else:
+        # One event per change point in the mixed timeline
+        timeline.schedule(scheduler, MotorOutput(pwm), start)
+    scheduler.on_finish(stop_motor if owned else motor_off, pwm)
     return pwm
 
 
-def set_motor_frequency(pwm, freq):
-    freq = max(20, min(freq, 2000))
-    pwm.ChangeFrequency(freq)
-    pwm.ChangeDutyCycle(50)
-
-
-def play_melody_on_motor(melody_data):
-    if not melody_data:
-        return
-
-    pwm = init_motor()
-    start = time.perf_counter()
-
-    try:
-        for note in melody_data:
-            while time.perf_counter() - start < note["time"]:
-                time.sleep(0.001)
-            set_motor_frequency(pwm, note["freq"])
-    finally:
-        pwm.ChangeDutyCycle(0)
-        pwm.stop()
-        GPIO.cleanup()
+def parse_timestamp(text):
+    # "62", "62.5" or "1:02"
+    minutes, _, seconds = text.strip().rpartition(":")
+    return float(seconds) + 60 * float(minutes or 0)
 
 
 # ------------------------
-# MELODY VISUALIZER
+# TIMING REPORT
 # ------------------------
-class MelodyVisualizer:
-    def __init__(self, root, melody_data):
-        self.root = root
-        self.melody_data = melody_data or []
-
-        self.canvas_height = 200
-        self.canvas = tk.Canvas(root, bg="black", height=self.canvas_height)
-        self.canvas.pack(fill="x")
-
-        if self.melody_data:
-            self.max_freq = max(m["freq"] for m in self.melody_data)
-            self.min_freq = min(m["freq"] for m in self.melody_data)
-        else:
-            self.max_freq = 1000
-            self.min_freq = 80
-
-        self.start_time = None
-
-    def draw_point(self, t, freq):
-        width = self.canvas.winfo_width() or 1
-        x = (t * 100) % width
-
-        y_range = max(self.max_freq - self.min_freq, 1)
-        y = self.canvas_height - ((freq - self.min_freq) / y_range) * self.canvas_height
-
-        r = 3
-        self.canvas.create_oval(x - r, y - r, x + r, y + r, fill="yellow", outline="")
-
-    def start(self):
-        self.start_time = time.perf_counter()
-        self.update()
-
-    def update(self):
-        if not self.melody_data:
-            return
-
-        now = time.perf_counter() - self.start_time
-
-        for note in self.melody_data:
-            if abs(note["time"] - now) < 0.02:
-                self.draw_point(note["time"], note["freq"])
+def print_timing_report(scheduler, visualizer=None):
+    for kind, stats in scheduler.report().items():
+        if stats["count"]:
+            print(
+                f"{kind}: {stats['count']} events, "
+                f"late mean {stats['mean_ms']:.1f}ms / p95 {stats['p95_ms']:.1f}ms / max {stats['max_ms']:.1f}ms"
+            )
 
-        self.root.after(10, self.update)
+    if visualizer is not None:
+        stats = visualizer.frame_stats()
+        if stats["frames"]:
+            print(
+                f"visualizer frames: {stats['frames']}, "
+                f"render mean {stats['render_ms_mean']:.2f}ms / p95 {stats['render_ms_p95']:.2f}ms, "
+                f"{stats.get('fps', 0):.1f} fps"
+            )
+    metrics.flush()
 
 
 # ------------------------
 # GUI PLAYER
 # ------------------------
 class LyricPlayer:
-    def __init__(self, root, fullscreen=False):
+    def __init__(self, root, loop, fullscreen=False):
         self.root = root
+        self.loop = loop
         self.root.configure(bg="black")
 
         if fullscreen:
@@ -379,117 +210,258 @@ class LyricPlayer:
         self.text.pack(expand=True, fill="both")
 
         self.text.tag_configure("highlight", foreground="yellow")
+        self.lyrics = LyricView(self.text)
 
-        self.word_positions = []
         self.word_data = []
-        self.melody_data = []
+        self.melody_data = Melody.empty()
+        self.note_data = notes.Notes.empty()
         self.current_file = None
         self.current_hash = None
         self.visualizer = None
-
-        tk.Button(root, text="Edit Transcript", command=self.edit_existing).pack(fill="x")
+        self.session = None
+        self.pwm = None  # opened on first play, shared by every session
+        self.transcribing = None  # the running StreamingTranscription, if any
+
+        controls = tk.Frame(root)
+        controls.pack(fill="x")
+        tk.Button(controls, text="Open Song", command=self.open_file).pack(side="left", expand=True, fill="x")
+        self.pause_button = tk.Button(controls, text="Pause", command=self.toggle_pause)
+        self.pause_button.pack(side="left", expand=True, fill="x")
+        tk.Button(controls, text="Edit Transcript", command=self.edit_existing).pack(side="left", expand=True, fill="x")
+
+        # Cue: jump to a timestamp (seconds or m:ss); arrow keys scrub
+        self.cue_entry = tk.Entry(controls, width=6)
+        self.cue_entry.pack(side="left")
+        self.cue_entry.bind("<Return>", lambda e: self.cue())
+        tk.Button(controls, text="Cue", command=self.cue).pack(side="left")
+        self.root.bind("<Left>", lambda e: self.scrub(-SCRUB_SECONDS))
+        self.root.bind("<Right>", lambda e: self.scrub(SCRUB_SECONDS))
 
     def prepare_text(self, transcript):
-        self.text.delete("1.0", tk.END)
-        self.text.insert("1.0", transcript)
-
-        index = "1.0"
-        self.word_positions = []
-
-        for word in transcript.split():
-            start_index = self.text.search(word, index, stopindex=tk.END)
-            if not start_index:
-                continue
-            end_index = f"{start_index}+{len(word)}c"
-            self.word_positions.append((start_index, end_index))
-            index = end_index
-
-    def highlight_word(self, index):
-        self.text.tag_remove("highlight", "1.0", tk.END)
-        if index < len(self.word_positions):
-            start, end = self.word_positions[index]
-            self.text.tag_add("highlight", start, end)
-            self.text.see(start)
-
-    def play(self, filepath):
+        self.lyrics.set_transcript(transcript)
+
+    def open_file(self, start=0.0):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Audio files", "*.wav *.mp3"), ("WAV files", "*.wav"), ("MP3 files", "*.mp3")]
+        )
+        if file_path:
+            self.play(file_path, start)
+
+    def play(self, filepath, start=0.0):
         self.current_file = filepath
         self.current_hash = get_file_hash(filepath)
-
-        transcript, word_data, melody_data = load_from_db(self.current_hash)
-
-        if not transcript:
-            transcript, word_data = transcribe(filepath)
-            melody_data = extract_melody(filepath)
-            save_to_db(
-                self.current_hash,
-                os.path.basename(filepath),
-                transcript,
-                word_data,
-                melody_data
-            )
+        self.transcribing = None
+
+        with metrics.timer("load_from_db"):
+            transcript, word_data, melody_data = load_from_db(self.current_hash)
+            progress = transcription_progress(self.current_hash)
+        metrics.cache("transcript", transcript is not None and progress is None)
+
+        streaming = False
+        if transcript is None or progress is not None:
+            # Not transcribed yet, or a streamed transcription was interrupted.
+            # Only now is the speech model (and torch) needed: load it in the
+            # background while the melody is extracted. Cached songs never do.
+            model_manager.warm_up(analysis.MODEL_SIZE, backend=analysis.ASR_BACKEND)
+            # Melody extraction is quick and the motor needs it from the start.
+            if melody_data is None:
+                melody_data = extract_melody(filepath)
+            if STREAM_ASR:
+                if transcript is None:
+                    transcript, word_data = "", []
+                    save_to_db(self.current_hash, os.path.basename(filepath), "", [], melody_data, transcribed_until=0.0)
+                streaming = True
+            else:
+                transcript, word_data = transcribe(filepath)
+                save_to_db(self.current_hash, os.path.basename(filepath), transcript, word_data, melody_data)
+            # Playback streams from disk; a streamed transcription reloads
+            # the 16 kHz view from pcm_cache/ and forgets it when done
+            audio_loader.forget(self.current_hash)
 
         self.word_data = word_data
-        self.melody_data = melody_data or []
-        self.prepare_text(transcript)
-
+        self.melody_data = melody_data if melody_data is not None else Melody.empty()
+        self.note_data = get_notes(self.current_hash, self.melody_data)
+
+        previous = self.session
+        self.session = PlaybackSession(filepath, self.bind_tracks, self.loop)
+        self.pause_button.config(text="Pause")
+        since = (progress or 0.0) if streaming else None
+        self.loop.create_task(self.start_session(self.session, previous, start, transcript, since))
+
+    async def start_session(self, session, previous, start, transcript, stream_since=None):
+        # The previous session's word and visualizer tracks fire until it is
+        # closed; only then do the shared lyric view and the canvas change song
+        if previous is not None:
+            await previous.close()
+        if self.session is not session:
+            return  # another play() took over while the old song shut down
+
+        with metrics.timer("prepare_text"):
+            self.prepare_text(transcript)
+        if self.visualizer is not None:
+            self.visualizer.stop()
+            self.visualizer.canvas.destroy()
         self.visualizer = MelodyVisualizer(self.root, self.melody_data)
-        self.visualizer.start()
 
-        threading.Thread(target=play_audio, args=(filepath,), daemon=True).start()
-        threading.Thread(target=self.sync_words, daemon=True).start()
-        threading.Thread(target=play_melody_on_motor, args=(self.melody_data,), daemon=True).start()
+        session.play(start)
+        if stream_since is not None:
+            session.spawn(self.stream_transcript(session.path, self.current_hash, stream_since))
+
+    def bind_tracks(self, scheduler, start):
+        # Called by the session for every (re)start: play, resume, seek
+        self.sync_words(scheduler, start)
+        if self.pwm is None:
+            self.pwm = init_motor(base_freq=MOTOR_BASE_FREQ, backend=ACTUATOR)
+        play_melody_on_motor(self.note_data, scheduler, self.word_data, start, self.pwm)
+        if len(self.melody_data):
+            scheduler.schedule_every(VISUALIZER_INTERVAL, "visualizer", self.visualizer.request, start=start)
+        scheduler.on_finish(print_timing_report, scheduler, self.visualizer)
+
+    def sync_words(self, scheduler, start=0.0):
+        # carry: the word being sung at the cue point lights up immediately
+        scheduler.add_track("word", EventIndex.from_words(self.word_data), self.lyrics.request, start, carry=True)
+
+    async def stream_transcript(self, filepath, file_hash, since):
+        # A session task: each chunk's words are shown, stored and scheduled
+        # as soon as they are ready. No review dialog; use Edit Transcript.
+        job = asr_backends.StreamingTranscription(
+            filepath, asr_backends.get_backend(analysis.ASR_BACKEND, analysis.MODEL_SIZE), analysis.ASR_VAD, since
+        )
+        self.transcribing = job
+        try:
+            await self.loop.run_in_executor(None, job.start)
+            for _, end, future in job:
+                words = await asyncio.wrap_future(future)
+                if self.transcribing is not job:
+                    return  # another play() took over before this session closed
+                first = len(self.word_data)
+                self.add_words(words)
+                until = None if end >= job.duration else end
+                append_words(file_hash, self.lyrics.transcript, words, first, until)
+            if not job.chunks:
+                append_words(file_hash, self.lyrics.transcript, [], len(self.word_data))
+        finally:
+            job.cancel()
+            audio_loader.forget(file_hash)
+            if self.transcribing is job:
+                self.transcribing = None
+
+    def add_words(self, words):
+        first = len(self.word_data)
+        self.word_data.extend(words)
+        self.lyrics.extend(" ".join(w["word"] for w in words))
+
+        scheduler = self.session.scheduler if self.session is not None else None
+        if scheduler is not None and words:
+            # Only the new words; earlier ones are already on the scheduler
+            scheduler.add_track(
+                "word", EventIndex.from_words(words), lambda i: self.lyrics.request(first + i),
+                scheduler.clock(), carry=True
+            )
+
+    def cue(self):
+        try:
+            seconds = parse_timestamp(self.cue_entry.get())
+        except ValueError:
+            messagebox.showerror("Cue", "Enter seconds or m:ss, e.g. 1:02")
+            return
+        if self.session is not None:
+            self.session.seek(seconds)
 
-    def sync_words(self):
-        start_time = time.perf_counter()
-        for i, word in enumerate(self.word_data):
-            while time.perf_counter() - start_time < word["start"]:
-                time.sleep(0.001)
-            self.root.after(0, self.highlight_word, i)
+    def scrub(self, delta):
+        if self.session is not None:
+            self.session.seek(self.session.position() + delta)
+
+    def toggle_pause(self):
+        if self.session is None:
+            return
+        if self.session.state == "playing":
+            self.session.pause()
+            self.pause_button.config(text="Resume")
+        elif self.session.state == "paused":
+            self.session.resume()
+            self.pause_button.config(text="Pause")
+
+    async def shutdown(self):
+        if self.session is not None:
+            await self.session.close()
+        if self.visualizer is not None:
+            self.visualizer.stop()
+        if self.pwm is not None:
+            stop_motor(self.pwm)
+        metrics.flush()
 
     def edit_existing(self):
         if not self.current_hash:
             messagebox.showinfo("No File", "Load a file first.")
             return
+        if self.transcribing is not None:
+            messagebox.showinfo("Transcribing", "Wait until the lyrics are complete.")
+            return
 
-        transcript, _, melody_data = load_from_db(self.current_hash)
+        transcript, word_data, _ = load_from_db(self.current_hash)
         edited_text = review_transcript(transcript)
 
         if edited_text:
-            new_word_data = align_to_edited_text(self.current_file, edited_text)
-            # Reuse existing melody_data; no need to recompute unless you want to
-            save_to_db(
-                self.current_hash,
-                os.path.basename(self.current_file),
-                edited_text,
-                new_word_data,
-                melody_data
-            )
+            new_word_data = align_words(word_data, edited_text, self.current_file)
+            audio_loader.forget(self.current_hash)
+            # Only the words change; melody and notes stay as stored
+            save_words(self.current_hash, edited_text, new_word_data)
 
             self.word_data = new_word_data
-            self.melody_data = melody_data or []
             self.prepare_text(edited_text)
+            if self.session is not None and self.session.state == "playing":
+                # Rebind from the current position so the new timings take effect
+                self.session.seek(self.session.position())
 
-            messagebox.showinfo("Updated", "Transcript re-aligned with fresh Whisper pass.")
+            messagebox.showinfo("Updated", "Transcript re-aligned from cached word timings.")
 
 
 # ------------------------
 # MAIN
 # ------------------------
 def main():
+    global ACTUATOR, MOTOR_MODE, STREAM_ASR
+
     parser = argparse.ArgumentParser()
     parser.add_argument("--fullscreen", action="store_true")
+    parser.add_argument("--actuator", choices=BACKEND_CHOICES, default=ACTUATOR)
+    parser.add_argument("--motor-mode", choices=["events", "wave"], default=MOTOR_MODE)
+    parser.add_argument("--asr", choices=sorted(asr_backends.BACKENDS), default=analysis.ASR_BACKEND)
+    parser.add_argument("--vad", action="store_true", default=analysis.ASR_VAD, help="skip silence before transcribing")
+    parser.add_argument("--no-stream", action="store_true", help="transcribe the whole song (and review it) before playing")
+    parser.add_argument("--file", help="song to play (skips the file dialog)")
+    parser.add_argument("--start", type=parse_timestamp, default=0.0, help="cue point, seconds or m:ss")
+    parser.add_argument("--metrics", help="write pipeline metrics here (.json, or .prom for Prometheus)")
     args = parser.parse_args()
+    ACTUATOR = args.actuator
+    MOTOR_MODE = args.motor_mode
+    analysis.ASR_BACKEND = args.asr
+    analysis.ASR_VAD = args.vad
+    STREAM_ASR = not args.no_stream
+
+    if args.metrics:
+        metrics.enable(args.metrics)
 
     init_db()
 
     root = tk.Tk()
-    player = LyricPlayer(root, fullscreen=args.fullscreen)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    pump_with_tk(root, loop)
 
-    file_path = filedialog.askopenfilename(filetypes=[("WAV files", "*.wav")])
-    if file_path:
-        player.play(file_path)
+    player = LyricPlayer(root, loop, fullscreen=args.fullscreen)
+    if args.file:
+        player.play(args.file, args.start)
+    else:
+        player.open_file(args.start)
 
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        # Window closed: stop the session (stream, scheduler, motor) cleanly
+        loop.run_until_complete(player.shutdown())
+        loop.close()
 
 
 if __name__ == "__main__":
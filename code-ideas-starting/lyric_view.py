@@ -0,0 +1,154 @@
+# #######################################################
+# Indexed lyric renderer for a Tk Text widget
+# - Word offsets from one regex pass over the transcript
+# - Transcript wrapped into lines once; only 1-2 lines rendered
+# - Highlight moves by removing just the previous word's tag
+# - Any thread may request a word; the Tk loop applies the
+#   latest request in batches
+# - Words can be appended while playing (streaming transcription)
+# #######################################################
+
+import re
+import tkinter.font as tkfont
+
+
+VISIBLE_LINES = 2
+FLUSH_INTERVAL = 15       # ms between highlight flushes on the Tk loop
+FALLBACK_LINE_CHARS = 32  # used before the widget has a real width
+
+
+class LyricView:
+    def __init__(self, text, visible_lines=VISIBLE_LINES):
+        self.text = text
+        self.visible_lines = visible_lines
+        self.font = tkfont.Font(font=text.cget("font"))
+
+        self.transcript = ""
+        self.words = []          # (start, end) character offsets in the transcript
+        self.lines = []          # (first word, end word) per wrapped line
+        self.line_of_word = []
+        self.layout_width = None
+
+        self.shown_line = None
+        self.view_offsets = {}   # word index -> (start, end) offsets in the widget
+        self.current = None
+        self._pending = None
+
+        self.text.bind("<Configure>", self._on_resize, add="+")
+        self.text.after(FLUSH_INTERVAL, self._flush)
+
+    # ------------------------
+    # LAYOUT
+    # ------------------------
+    def set_transcript(self, transcript):
+        self.transcript = transcript
+        self.words = [m.span() for m in re.finditer(r"\S+", transcript)]
+        self.current = None
+        self._pending = None
+        self._layout()
+        self._show_line(0)
+
+    def extend(self, text):
+        # More words at the end; the highlighted word stays where it is
+        if not text:
+            return
+        base = len(self.transcript) + 1 if self.transcript else 0
+        self.transcript = f"{self.transcript} {text}" if self.transcript else text
+        self.words.extend((base + m.start(), base + m.end()) for m in re.finditer(r"\S+", text))
+
+        current = self.current
+        self._layout()
+        if current is not None:
+            self._show_line(self.line_of_word[current])
+            self.highlight(current)
+        else:
+            self._show_line(self.shown_line or 0)
+
+    def _layout(self):
+        width = self.text.winfo_width()
+        if width > 1:
+            self.layout_width = limit = width
+            measure = self.font.measure
+        else:
+            self.layout_width = None
+            limit = FALLBACK_LINE_CHARS
+            measure = len
+        space = measure(" ")
+
+        self.lines = []
+        self.line_of_word = []
+        first = 0
+        used = 0
+        for i, (start, end) in enumerate(self.words):
+            size = measure(self.transcript[start:end])
+            if i > first and used + space + size > limit:
+                self.lines.append((first, i))
+                first = i
+                used = size
+            else:
+                used += (space if i > first else 0) + size
+            self.line_of_word.append(len(self.lines))
+
+        if first < len(self.words):
+            self.lines.append((first, len(self.words)))
+
+    def _show_line(self, line):
+        self.shown_line = line
+        self.current = None
+        self.view_offsets = {}
+
+        parts = []
+        offset = 0
+        for first, end in self.lines[line:line + self.visible_lines]:
+            if parts:
+                parts.append("\n")
+                offset += 1
+            for i in range(first, end):
+                if i > first:
+                    parts.append(" ")
+                    offset += 1
+                start, stop = self.words[i]
+                parts.append(self.transcript[start:stop])
+                self.view_offsets[i] = (offset, offset + stop - start)
+                offset += stop - start
+
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", "".join(parts))
+
+    def _on_resize(self, event):
+        if self.words and event.width > 1 and event.width != self.layout_width:
+            current = self.current
+            self._layout()
+            line = self.line_of_word[current] if current is not None else 0
+            self._show_line(line)
+            if current is not None:
+                self.highlight(current)
+
+    # ------------------------
+    # HIGHLIGHT
+    # ------------------------
+    def highlight(self, index):
+        # Tk thread only
+        if index >= len(self.words):
+            return
+
+        line = self.line_of_word[index]
+        if line != self.shown_line:
+            self._show_line(line)
+        elif self.current is not None:
+            start, end = self.view_offsets[self.current]
+            self.text.tag_remove("highlight", f"1.0+{start}c", f"1.0+{end}c")
+
+        start, end = self.view_offsets[index]
+        self.text.tag_add("highlight", f"1.0+{start}c", f"1.0+{end}c")
+        self.current = index
+
+    def request(self, index):
+        # Safe from any thread: only the newest request is drawn
+        self._pending = index
+
+    def _flush(self):
+        index = self._pending
+        if index is not None and index != self.current:
+            self.highlight(index)
+        self.text.after(FLUSH_INTERVAL, self._flush)
@@ -0,0 +1,69 @@
+# #######################################################
+# Compact melody representation
+# - Packed float32 time / frequency arrays instead of per-frame dicts
+# - Stored as one BLOB, loaded zero-copy with np.frombuffer
+# - Time lookups via np.searchsorted
+# #######################################################
+
+import json
+
+import numpy as np
+
+
+class Melody:
+    def __init__(self, times, freqs):
+        self.times = np.asarray(times, dtype=np.float32)
+        self.freqs = np.asarray(freqs, dtype=np.float32)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32))
+
+    @classmethod
+    def from_frames(cls, frame_times, f0):
+        voiced = ~np.isnan(f0)
+        return cls(frame_times[voiced], f0[voiced])
+
+    # ------------------------
+    # SERIALIZATION
+    # ------------------------
+    def to_bytes(self):
+        return np.stack([self.times, self.freqs]).astype(np.float32).tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob):
+        # Views straight into the blob: no copy, read-only
+        packed = np.frombuffer(blob, dtype=np.float32).reshape(2, -1)
+        return cls(packed[0], packed[1])
+
+    @classmethod
+    def from_json(cls, text):
+        # Rows cached before the BLOB format: [{"time": ..., "freq": ...}, ...]
+        notes = json.loads(text)
+        return cls([n["time"] for n in notes], [n["freq"] for n in notes])
+
+    # ------------------------
+    # LOOKUP
+    # ------------------------
+    def __len__(self):
+        return len(self.times)
+
+    def index_at(self, t):
+        return int(np.searchsorted(self.times, t))
+
+    def window(self, start, end):
+        lo, hi = np.searchsorted(self.times, [start, end])
+        return self.times[lo:hi], self.freqs[lo:hi]
+
+    def freq_range(self, default=(80.0, 1000.0)):
+        if not len(self):
+            return default
+        return float(self.freqs.min()), float(self.freqs.max())
+
+
+def load_melody(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return Melody.from_json(value)
+    return Melody.from_bytes(value)
@@ -0,0 +1,176 @@
+# #######################################################
+# Pipeline metrics
+# - Stage timers, counters (cache hits / misses, underruns) and
+#   event-lateness histograms per scheduler kind
+# - Off by default: every call is a flag check until enable()
+# - Written as JSON, or Prometheus text format for *.prom files
+#   (e.g. the node_exporter textfile collector)
+# #######################################################
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+PREFIX = "feeld"
+# Upper bounds in ms; one more bucket catches everything later
+LATENESS_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+ENABLED = False
+_path = None
+_lock = threading.Lock()
+_timers = {}       # (name, labels) -> [count, total seconds, max seconds]
+_counters = {}     # (name, labels) -> value
+_histograms = {}   # kind -> [bucket counts..., overflow], sum, count
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def enable(path=None):
+    # path: where flush() writes; format picked from the extension
+    global ENABLED, _path
+    ENABLED = True
+    _path = path
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        _histograms.clear()
+
+
+# ------------------------
+# RECORDING
+# ------------------------
+def add_time(name, seconds, **labels):
+    if not ENABLED:
+        return
+    with _lock:
+        entry = _timers.setdefault(_key(name, labels), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+
+@contextmanager
+def timer(name, **labels):
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - start, **labels)
+
+
+def count(name, value=1, **labels):
+    if not ENABLED:
+        return
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def cache(name, hit):
+    count("cache_hits" if hit else "cache_misses", cache=name)
+
+
+def lateness(kind, seconds):
+    # Called by the scheduler for every event it fires
+    if not ENABLED:
+        return
+    ms = 1000 * seconds
+    bucket = 0
+    while bucket < len(LATENESS_BUCKETS_MS) and ms > LATENESS_BUCKETS_MS[bucket]:
+        bucket += 1
+    with _lock:
+        entry = _histograms.setdefault(kind, [[0] * (len(LATENESS_BUCKETS_MS) + 1), 0.0, 0])
+        entry[0][bucket] += 1
+        entry[1] += seconds
+        entry[2] += 1
+
+
+# ------------------------
+# OUTPUT
+# ------------------------
+def snapshot():
+    with _lock:
+        return {
+            "timers": [
+                {"name": name, "labels": dict(labels), "count": c, "seconds": total, "max_seconds": peak}
+                for (name, labels), (c, total, peak) in sorted(_timers.items())
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(_counters.items())
+            ],
+            "lateness": {
+                kind: {
+                    "buckets_ms": list(LATENESS_BUCKETS_MS),
+                    "counts": list(buckets),
+                    "sum_seconds": total,
+                    "count": c,
+                }
+                for kind, (buckets, total, c) in sorted(_histograms.items())
+            },
+        }
+
+
+def _labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def to_prometheus(snap=None):
+    snap = snap or snapshot()
+    # Each metric family's samples must follow its own TYPE line
+    stages = [(_labels(dict(stage=t["name"], **t["labels"])), t) for t in snap["timers"]]
+    lines = [f"# TYPE {PREFIX}_stage_seconds summary"]
+    for labels, t in stages:
+        lines.append(f"{PREFIX}_stage_seconds_sum{labels} {t['seconds']:.6f}")
+        lines.append(f"{PREFIX}_stage_seconds_count{labels} {t['count']}")
+    lines.append(f"# TYPE {PREFIX}_stage_seconds_max gauge")
+    for labels, t in stages:
+        lines.append(f"{PREFIX}_stage_seconds_max{labels} {t['max_seconds']:.6f}")
+
+    names = sorted({c["name"] for c in snap["counters"]})
+    for name in names:
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        for c in snap["counters"]:
+            if c["name"] == name:
+                lines.append(f"{PREFIX}_{name}_total{_labels(c['labels'])} {c['value']}")
+
+    lines.append(f"# TYPE {PREFIX}_event_lateness_seconds histogram")
+    for kind, h in snap["lateness"].items():
+        cumulative = 0
+        for bound, n in zip(h["buckets_ms"] + ["+Inf"], h["counts"]):
+            cumulative += n
+            le = bound if bound == "+Inf" else f"{bound / 1000:g}"
+            lines.append(f"{PREFIX}_event_lateness_seconds_bucket{_labels({'kind': kind}, le=le)} {cumulative}")
+        lines.append(f"{PREFIX}_event_lateness_seconds_sum{_labels({'kind': kind})} {h['sum_seconds']:.6f}")
+        lines.append(f"{PREFIX}_event_lateness_seconds_count{_labels({'kind': kind})} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write(path):
+    snap = snapshot()
+    text = to_prometheus(snap) if path.endswith(".prom") else json.dumps(snap, indent=2)
+    # Replace atomically so a scraper never reads a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def flush():
+    # Writes to the path given to enable(), if any
+    if ENABLED and _path:
+        write(_path)
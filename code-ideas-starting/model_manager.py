@@ -0,0 +1,78 @@
+# #######################################################
+# Process-wide speech model manager
+# - Loads models lazily on first use
+# - Caches loaded models by (backend, size, device)
+# - Backends: openai-whisper, faster-whisper (CTranslate2 int8)
+# - Optional background warm-up at startup
+# #######################################################
+
+import threading
+
+import metrics
+
+
+_models = {}
+_lock = threading.Lock()
+
+
+def _resolve_device(device, backend="whisper"):
+    if device is not None:
+        return device
+    if backend == "faster-whisper":
+        return "cpu"  # the int8 CPU path; pass device="cuda" explicitly for a GPU
+    try:
+        import torch
+    except ImportError:
+        return "cpu"  # faster-whisper installs don't need torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _load_whisper(size, device):
+    import whisper
+    return whisper.load_model(size, device=device)
+
+
+def _load_faster_whisper(size, device):
+    from faster_whisper import WhisperModel
+    # int8 weights on the CPU: the fast path on a Raspberry Pi
+    compute_type = "int8" if device == "cpu" else "float16"
+    return WhisperModel(size, device=device, compute_type=compute_type)
+
+
+LOADERS = {
+    "whisper": _load_whisper,
+    "faster-whisper": _load_faster_whisper,
+}
+
+
+def get_model(size, device=None, backend="whisper"):
+    key = (backend, size, _resolve_device(device, backend))
+
+    # Holding the lock while loading means a warm-up thread and a caller
+    # asking for the same model never load it twice.
+    with _lock:
+        model = _models.get(key)
+        metrics.cache("model", model is not None)
+        if model is None:
+            with metrics.timer("model_load", backend=backend, size=size):
+                model = LOADERS[backend](size, key[2])
+            _models[key] = model
+        return model
+
+
+def warm_up(size, device=None, backend="whisper"):
+    thread = threading.Thread(target=get_model, args=(size, device, backend), daemon=True)
+    thread.start()
+    return thread
+
+
+def is_loaded(size, device=None, backend="whisper"):
+    return (backend, size, _resolve_device(device, backend)) in _models
+
+
+def unload(size=None, device=None, backend="whisper"):
+    with _lock:
+        if size is None:
+            _models.clear()
+            return
+        _models.pop((backend, size, _resolve_device(device, backend)), None)
@@ -0,0 +1,55 @@
+# #######################################################
+# DC motor control via PWM
+# - Shared by lyric_player.py, live_input.py and haptics playback
+# - Hardware behind actuators.py (rpi / pigpio / sim backends)
+# #######################################################
+
+from actuators import open_actuator, BACKENDS
+
+
+MOTOR_PIN = 18  # PWM-capable GPIO pin
+BACKEND_CHOICES = ["auto"] + sorted(BACKENDS)
+
+
+def init_motor(pin=MOTOR_PIN, base_freq=100, backend="auto"):
+    # Every backend starts with the motor off
+    return open_actuator(backend, pin, base_freq)
+
+
+def set_pwm_frequency(pwm, freq):
+    pwm.set_frequency(max(20, min(freq, 2000)))
+
+
+def set_motor_frequency(pwm, freq):
+    set_pwm_frequency(pwm, freq)
+    pwm.set_duty(50)
+
+
+def set_motor_duty(pwm, duty):
+    pwm.set_duty(max(0, min(duty, 100)))
+
+
+def motor_off(pwm):
+    pwm.set_duty(0)
+
+
+def stop_motor(pwm):
+    motor_off(pwm)
+    pwm.close()
+
+
+class MotorOutput:
+    # Applies haptic timeline points, touching the PWM only for values
+    # that actually changed
+    def __init__(self, pwm):
+        self.pwm = pwm
+        self.duty = None
+        self.freq = None
+
+    def apply(self, duty, freq):
+        if freq != self.freq:
+            set_pwm_frequency(self.pwm, freq)
+            self.freq = freq
+        if duty != self.duty:
+            set_motor_duty(self.pwm, duty)
+            self.duty = duty
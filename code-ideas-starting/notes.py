@@ -0,0 +1,113 @@
+# #######################################################
+# Melody -> note compiler for the motor stream
+# - Median smoothing of the pitch track (in semitones)
+# - Hysteresis: a new note only when pitch moves far enough
+# - Minimum note length: blips merge into the previous note
+# - Output: packed onset / duration / frequency arrays
+# #######################################################
+
+import json
+
+import numpy as np
+
+
+DEFAULT_PARAMS = {
+    "hysteresis": 0.6,     # semitones the pitch must move to start a new note
+    "median_window": 5,    # frames
+    "min_note": 0.08,      # seconds
+    "max_gap": 0.06,       # unvoiced gap (seconds) that ends a note
+}
+
+
+def hz_to_midi(freqs):
+    return 69.0 + 12.0 * np.log2(freqs / 440.0)
+
+
+def midi_to_hz(midi):
+    return 440.0 * 2.0 ** ((midi - 69.0) / 12.0)
+
+
+class Notes:
+    def __init__(self, onsets, durations, freqs):
+        self.onsets = np.asarray(onsets, dtype=np.float32)
+        self.durations = np.asarray(durations, dtype=np.float32)
+        self.freqs = np.asarray(freqs, dtype=np.float32)
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [])
+
+    def __len__(self):
+        return len(self.onsets)
+
+    @property
+    def ends(self):
+        return self.onsets + self.durations
+
+    def to_bytes(self):
+        return np.stack([self.onsets, self.durations, self.freqs]).astype(np.float32).tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob):
+        packed = np.frombuffer(blob, dtype=np.float32).reshape(3, -1)
+        return cls(packed[0], packed[1], packed[2])
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+# ------------------------
+# COMPILE
+# ------------------------
+def compile_notes(melody, params=None):
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    times = np.asarray(melody.times, dtype=np.float64)
+    freqs = np.asarray(melody.freqs, dtype=np.float64)
+    # Unvoiced frames (NaN or 0 Hz) are gaps, not notes
+    voiced = freqs > 0
+    times, freqs = times[voiced], freqs[voiced]
+    if len(times) == 0:
+        return Notes.empty()
+
+    frame = float(np.median(np.diff(times))) if len(times) > 1 else 0.01
+    from scipy.ndimage import median_filter  # only needed when compiling, not for cached notes
+    midi = median_filter(hz_to_midi(freqs), size=max(1, params["median_window"]), mode="nearest")
+
+    # Frame indices where a note must end: an unvoiced gap or a pitch jump
+    # beyond the hysteresis band around the current note's pitch.
+    gaps = np.diff(times) > params["max_gap"]
+    bounds = [0]
+    reference = midi[0]
+    count = 1
+    for i in range(1, len(midi)):
+        if gaps[i - 1] or abs(midi[i] - reference) > params["hysteresis"]:
+            bounds.append(i)
+            reference = midi[i]
+            count = 1
+        else:
+            # Running mean keeps slow vibrato inside one note
+            count += 1
+            reference += (midi[i] - reference) / count
+    bounds.append(len(midi))
+
+    onsets, ends, pitches = [], [], []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        onset = times[lo]
+        end = times[hi - 1] + frame
+        pitch = float(np.median(midi[lo:hi]))
+
+        too_short = end - onset < params["min_note"]
+        touches_previous = ends and onset - ends[-1] <= params["max_gap"]
+        if too_short and touches_previous:
+            ends[-1] = end
+            continue
+        if too_short:
+            continue
+
+        onsets.append(onset)
+        ends.append(end)
+        pitches.append(pitch)
+
+    onsets = np.asarray(onsets)
+    return Notes(onsets, np.asarray(ends) - onsets, midi_to_hz(np.asarray(pitches)))
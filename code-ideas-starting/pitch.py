@@ -0,0 +1,166 @@
+# #######################################################
+# Configurable pitch extraction
+# - Presets: accurate (old behaviour), fast, pyin, autocorr
+# - Optional downsampling and larger hop before analysis
+# - YIN / pYIN via librosa, or a vectorized FFT autocorrelation
+# - librosa is imported on first use, so cached songs never load it
+# - Long files split into hop-aligned chunks; workers > 1 (or 0, one
+#   per core) spreads them over a process pool, opt-in per call
+# #######################################################
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import audio_loader
+import metrics
+
+
+PRESETS = {
+    # What extract_melody always did: native rate, librosa.yin defaults
+    "accurate": {
+        "algorithm": "yin", "sr": None, "frame_length": 2048, "hop_length": 512,
+        "fmin": 80, "fmax": 1000, "chunk_seconds": None, "workers": 1,
+    },
+    "fast": {
+        "algorithm": "yin", "sr": 16000, "frame_length": 1024, "hop_length": 320,
+        "fmin": 80, "fmax": 1000, "chunk_seconds": 30, "workers": 1,
+    },
+    "pyin": {
+        "algorithm": "pyin", "sr": 16000, "frame_length": 1024, "hop_length": 320,
+        "fmin": 80, "fmax": 1000, "chunk_seconds": 30, "workers": 1,
+    },
+    "autocorr": {
+        "algorithm": "autocorr", "sr": 16000, "frame_length": 1024, "hop_length": 320,
+        "fmin": 80, "fmax": 1000, "chunk_seconds": None, "workers": 1,
+    },
+}
+
+AUTOCORR_THRESHOLD = 0.35  # normalized peak below this counts as unvoiced
+AUTOCORR_BATCH = 1024      # frames per FFT batch, bounds memory
+
+
+def pitch_config(preset="fast", **overrides):
+    config = dict(PRESETS[preset])
+    config.update(overrides)
+    return config
+
+
+# ------------------------
+# ALGORITHMS
+# ------------------------
+def autocorr_pitch(frames, sr, fmin, fmax):
+    n = frames.shape[1]
+    min_lag = max(1, int(sr / fmax))
+    max_lag = min(n - 2, int(sr / fmin))
+
+    windowed = frames * np.hanning(n)
+    spectrum = np.fft.rfft(windowed, 2 * n, axis=1)
+    corr = np.fft.irfft(np.abs(spectrum) ** 2, axis=1)[:, :n]
+
+    energy = corr[:, 0]
+    corr = corr / np.maximum(energy, 1e-12)[:, None]
+
+    lags = min_lag + np.argmax(corr[:, min_lag:max_lag + 1], axis=1)
+    rows = np.arange(len(lags))
+    peak = corr[rows, lags]
+
+    # Parabolic interpolation around the peak for sub-sample lag
+    left = corr[rows, lags - 1]
+    right = corr[rows, lags + 1]
+    denom = left - 2 * peak + right
+    shift = np.zeros_like(peak)
+    np.divide(0.5 * (left - right), denom, out=shift, where=np.abs(denom) > 1e-12)
+    shift = np.clip(shift, -0.5, 0.5)
+
+    f0 = sr / (lags + shift)
+    f0[(peak < AUTOCORR_THRESHOLD) | (energy <= 1e-8)] = np.nan
+    return f0
+
+
+def _track_frames(y, sr, config):
+    # y is already padded; frame i covers y[i*hop : i*hop + frame_length]
+    algorithm = config["algorithm"]
+    frame_length = config["frame_length"]
+    hop_length = config["hop_length"]
+
+    if algorithm in ("yin", "pyin"):
+        import librosa
+
+    if algorithm == "yin":
+        return librosa.yin(
+            y, fmin=config["fmin"], fmax=config["fmax"], sr=sr,
+            frame_length=frame_length, hop_length=hop_length, center=False
+        )
+
+    if algorithm == "pyin":
+        f0, _, _ = librosa.pyin(
+            y, fmin=config["fmin"], fmax=config["fmax"], sr=sr,
+            frame_length=frame_length, hop_length=hop_length, center=False
+        )
+        return f0
+
+    if algorithm == "autocorr":
+        frames = np.lib.stride_tricks.sliding_window_view(y, frame_length)[::hop_length]
+        return np.concatenate([
+            autocorr_pitch(frames[i:i + AUTOCORR_BATCH], sr, config["fmin"], config["fmax"])
+            for i in range(0, len(frames), AUTOCORR_BATCH)
+        ]) if len(frames) else np.empty(0)
+
+    raise ValueError(f"Unknown pitch algorithm: {algorithm}")
+
+
+def _track_chunk(args):
+    return _track_frames(*args)
+
+
+# ------------------------
+# PUBLIC API
+# ------------------------
+def track_pitch(y, sr, config):
+    with metrics.timer("pitch", algorithm=config["algorithm"]):
+        return _track_pitch(y, sr, config)
+
+
+def _track_pitch(y, sr, config):
+    if config["sr"] and config["sr"] != sr:
+        import librosa
+        y = librosa.resample(y, orig_sr=sr, target_sr=config["sr"])
+        sr = config["sr"]
+
+    frame_length = config["frame_length"]
+    hop_length = config["hop_length"]
+
+    # Same framing as librosa's center=True, done once up front so chunks
+    # can be cut on frame boundaries and stitched back without seams.
+    pad = frame_length // 2
+    padded = np.pad(y, (pad, frame_length - pad))
+    n_frames = 1 + len(y) // hop_length
+
+    chunk_frames = n_frames
+    if config["chunk_seconds"]:
+        chunk_frames = max(1, int(config["chunk_seconds"] * sr / hop_length))
+
+    chunks = []
+    for first in range(0, n_frames, chunk_frames):
+        last = min(first + chunk_frames, n_frames)
+        segment = padded[first * hop_length:(last - 1) * hop_length + frame_length]
+        chunks.append((segment, sr, config))
+
+    # A pool costs a process start-up per call, so it is opt-in
+    workers = config["workers"] or os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            f0 = np.concatenate(list(pool.map(_track_chunk, chunks)))
+    else:
+        f0 = np.concatenate([_track_chunk(chunk) for chunk in chunks])
+
+    times = np.arange(len(f0)) * hop_length / sr  # librosa.frames_to_time
+    return times, f0
+
+
+def extract_pitch(audio_path, config):
+    # Decoded once per song, shared with speech recognition (audio_loader.py)
+    y, sr = audio_loader.load(audio_path, config["sr"])
+    return track_pitch(y, sr, config)
@@ -0,0 +1,189 @@
+# #######################################################
+# Headless library pre-transcription
+# - Scans directories for audio, hashes with get_file_hash
+# - Skips anything already cached in transcripts.db
+# - ASR (Whisper or faster-whisper) + melody extraction spread
+#   over a process pool
+# - Motor notes compiled and cached as each song finishes
+# - Resumable job queue stored next to the cache
+#
+#   python prepare.py mp3/ --workers 2
+# #######################################################
+
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from storage import init_db, save_to_db, cached_hashes, transaction, fetch_all
+from fingerprint import get_file_hash
+from analysis import get_notes, run_asr, extract_melody, ASR_BACKEND
+import asr_backends
+import audio_loader
+import metrics
+
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".m4a")
+
+
+# ------------------------
+# JOB QUEUE
+# ------------------------
+def init_jobs():
+    # A run that was killed mid-song left its jobs "running"; pick them up again.
+    with transaction() as conn:
+        conn.execute("UPDATE prepare_jobs SET status='pending' WHERE status='running'")
+
+
+def set_job(file_hash, path, status, error=None):
+    with transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO prepare_jobs VALUES (?, ?, ?, ?, ?)",
+            (file_hash, path, status, error, time.time())
+        )
+
+
+def failed_hashes():
+    rows = fetch_all("SELECT file_hash FROM prepare_jobs WHERE status='failed'")
+    return {row[0] for row in rows}
+
+
+# ------------------------
+# SCAN
+# ------------------------
+def scan(paths, recursive=False):
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            for name in sorted(filenames):
+                if name.lower().endswith(AUDIO_EXTENSIONS):
+                    found.append(os.path.join(dirpath, name))
+            if not recursive:
+                break
+    return found
+
+
+def build_queue(paths, recursive=False, retry_failed=False):
+    done = cached_hashes()
+    failed = set() if retry_failed else failed_hashes()
+
+    queue = []
+    seen = set()
+    for path in scan(paths, recursive):
+        file_hash = get_file_hash(path)
+        if file_hash in done or file_hash in failed or file_hash in seen:
+            continue
+        seen.add(file_hash)
+        set_job(file_hash, path, "pending")
+        queue.append((file_hash, path))
+    return queue
+
+
+# ------------------------
+# WORKERS
+# ------------------------
+def transcribe_job(path, backend, vad):
+    start = time.perf_counter()
+    text, word_data = run_asr(path, backend, vad)
+    # Pool workers are reused across songs; don't keep this one's PCM
+    audio_loader.forget()
+    return text, word_data, time.perf_counter() - start
+
+
+def melody_job(path):
+    start = time.perf_counter()
+    # Already inside a pool worker: never start a nested pitch pool
+    melody = extract_melody(path, workers=1)
+    audio_loader.forget()
+    return melody, time.perf_counter() - start
+
+
+# ------------------------
+# RUN
+# ------------------------
+def prepare(paths, workers=2, recursive=False, retry_failed=False, asr=ASR_BACKEND, vad=False):
+    init_db()
+    init_jobs()
+
+    queue = build_queue(paths, recursive, retry_failed)
+    total = len(queue)
+    if not total:
+        print("Everything is already cached.")
+        return 0
+
+    print(f"Preparing {total} file(s) with {workers} worker(s)...")
+    results = {}
+    finished = 0
+    failures = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for file_hash, path in queue:
+            set_job(file_hash, path, "running")
+            results[file_hash] = {}
+            futures[pool.submit(transcribe_job, path, asr, vad)] = (file_hash, path, "transcript")
+            futures[pool.submit(melody_job, path)] = (file_hash, path, "melody")
+
+        for future in as_completed(futures):
+            file_hash, path, kind = futures[future]
+            name = os.path.basename(path)
+            entry = results.get(file_hash)
+            if entry is None:
+                continue  # the other half of this song already failed
+
+            try:
+                entry[kind] = future.result()
+            except Exception as exc:
+                results.pop(file_hash)
+                set_job(file_hash, path, "failed", f"{kind}: {exc}")
+                finished += 1
+                failures += 1
+                print(f"[{finished}/{total}] {name}: {kind} failed ({exc})")
+                continue
+
+            print(f"  {name}: {kind} done ({entry[kind][-1]:.1f}s)")
+            # Workers are separate processes; their timings come back with the result
+            metrics.add_time("asr" if kind == "transcript" else "extract_melody", entry[kind][-1])
+
+            if "transcript" in entry and "melody" in entry:
+                transcript, word_data, _ = entry["transcript"]
+                melody_data, _ = entry["melody"]
+                save_to_db(file_hash, name, transcript, word_data, melody_data)
+                get_notes(file_hash, melody_data)
+                set_job(file_hash, path, "done")
+                results.pop(file_hash)
+                finished += 1
+                print(f"[{finished}/{total}] {name} cached")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {total - failures} cached, {failures} failed in {elapsed:.1f}s")
+    return failures
+
+
+# ------------------------
+# MAIN
+# ------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Pre-transcribe a music library into transcripts.db")
+    parser.add_argument("paths", nargs="+", help="audio files or directories (e.g. mp3/)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--retry-failed", action="store_true")
+    parser.add_argument("--asr", choices=sorted(asr_backends.BACKENDS), default=ASR_BACKEND)
+    parser.add_argument("--vad", action="store_true", help="skip silence before transcribing")
+    parser.add_argument("--metrics", help="write pipeline metrics here (.json, or .prom for Prometheus)")
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.enable(args.metrics)
+
+    failures = prepare(args.paths, args.workers, args.recursive, args.retry_failed, args.asr, args.vad)
+    metrics.flush()
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
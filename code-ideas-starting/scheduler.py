@@ -0,0 +1,162 @@
+# #######################################################
+# Master playback scheduler
+# - One thread, one timer heap for every timed event
+# - Time comes from the audio device clock (AudioStream.position)
+# - Re-reads the clock after every wait, so drift never accumulates
+# - Per-event-kind lateness stats (histograms in metrics.py)
+# - Tracks (sorted event arrays) keep only their next event on the
+#   heap, so starting at any cue point is one binary search each
+# #######################################################
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+import metrics
+
+
+MAX_WAIT = 0.05        # never sleep longer than this without re-reading the clock
+STATS_WINDOW = 2048    # lateness samples kept per kind for percentiles
+
+
+class LatenessStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=STATS_WINDOW)
+
+    def add(self, lateness):
+        self.count += 1
+        self.total += lateness
+        self.max = max(self.max, lateness)
+        self.samples.append(lateness)
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.total / self.count,
+            "p95_ms": 1000 * ordered[int(0.95 * (len(ordered) - 1))],
+            "max_ms": 1000 * self.max,
+        }
+
+
+class WallClock:
+    # Stand-in media clock for runs without an audio device.
+    def __init__(self):
+        self.start = None
+
+    def begin(self):
+        self.start = time.perf_counter()
+
+    def __call__(self):
+        if self.start is None:
+            return 0.0
+        return time.perf_counter() - self.start
+
+
+class PlaybackScheduler:
+    def __init__(self, clock, finished=None):
+        self.clock = clock
+        # Set when the media source has ended; remaining future events are dropped.
+        self.finished = finished
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self._finish_callbacks = []
+        self.stats = {}
+
+    # ------------------------
+    # EVENTS
+    # ------------------------
+    def schedule(self, at, kind, callback, *args):
+        with self._cond:
+            heapq.heappush(self._heap, (at, next(self._seq), kind, callback, args))
+            self._cond.notify()
+
+    def schedule_every(self, interval, kind, callback, start=0.0, until=None):
+        def tick(at):
+            callback(at)
+            following = at + interval
+            if until is None or following <= until:
+                self.schedule(following, kind, tick, following)
+
+        self.schedule(start, kind, tick, start)
+
+    def add_track(self, kind, index, callback, start=0.0, carry=False):
+        # index: event_index.EventIndex; callback(i) per event.
+        # carry: also fire the event already in effect at `start`.
+        first = index.first_from(start)
+        if carry and first > 0 and (first == len(index) or index.times[first] > start):
+            self.schedule(start, kind, self._fire_track, kind, index, callback, first - 1)
+        elif first < len(index):
+            self.schedule(float(index.times[first]), kind, self._fire_track, kind, index, callback, first)
+
+    def _fire_track(self, kind, index, callback, i):
+        callback(i)
+        following = i + 1
+        if following < len(index):
+            self.schedule(float(index.times[following]), kind, self._fire_track, kind, index, callback, following)
+
+    def on_finish(self, callback, *args):
+        self._finish_callbacks.append((callback, args))
+
+    # ------------------------
+    # RUN
+    # ------------------------
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def join(self, timeout=None):
+        # Headless runs (finished=None) end on their own once the heap drains
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    if self._stopped:
+                        break
+                    if not self._heap:
+                        # Nothing queued, but the media is still playing.
+                        if self.finished is None or self.finished.is_set():
+                            break
+                        self._cond.wait(MAX_WAIT)
+                        continue
+                    at, _, kind, callback, args = self._heap[0]
+
+                    now = self.clock()
+                    if at > now:
+                        if self.finished is not None and self.finished.is_set():
+                            break
+                        self._cond.wait(min(at - now, MAX_WAIT))
+                        continue
+
+                    heapq.heappop(self._heap)
+
+                self.stats.setdefault(kind, LatenessStats()).add(now - at)
+                metrics.lateness(kind, now - at)
+                callback(*args)
+        finally:
+            for callback, args in self._finish_callbacks:
+                callback(*args)
+
+    def report(self):
+        return {kind: stats.summary() for kind, stats in self.stats.items()}
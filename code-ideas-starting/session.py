@@ -0,0 +1,148 @@
+# #######################################################
+# Playback sessions on an asyncio loop
+# - One PlaybackSession per song: audio stream, scheduler and
+#   everything bound to them live and die together
+# - Pause / resume / seek reopen the stream at a position and
+#   rebind every track from there
+# - A new session waits for the previous one to shut down, so
+#   songs never overlap and no threads are left behind
+# - Tk pumps the loop (pump_with_tk); headless callers use
+#   asyncio.run
+# #######################################################
+
+import asyncio
+import time
+
+from audio_stream import AudioStream
+from scheduler import PlaybackScheduler
+import metrics
+
+
+POLL_INTERVAL = 0.05  # seconds between end-of-song checks
+PUMP_INTERVAL = 10    # ms between Tk -> asyncio pumps
+
+
+def pump_with_tk(root, loop, interval=PUMP_INTERVAL):
+    # Runs whatever is ready on the loop, then hands control back to Tk
+    def pump():
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+        root.after(interval, pump)
+
+    root.after(interval, pump)
+
+
+class PlaybackSession:
+    def __init__(self, path, bind, loop=None, output="device"):
+        # bind(scheduler, start): schedule every track from `start` seconds on,
+        # registering cleanup with scheduler.on_finish.
+        # output: "device", or "null" for headless runs (audio_stream.py)
+        self.path = path
+        self.bind = bind
+        self.output = output
+        self.loop = loop or asyncio.get_running_loop()
+
+        self.state = "stopped"    # stopped / playing / paused / finished / closed
+        self.stream = None
+        self.scheduler = None
+        self.resume_at = 0.0
+        self._run = None
+        self._generation = 0
+        self._tasks = set()
+
+    # ------------------------
+    # TASKS
+    # ------------------------
+    def spawn(self, coro):
+        # Background work owned by this session; cancelled on close()
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _cancel_run(self):
+        run, self._run = self._run, None
+        if run is not None and not run.done():
+            run.cancel()
+            try:
+                await run
+            except asyncio.CancelledError:
+                pass
+
+    async def _play(self, start, generation, after=None):
+        if after is not None:
+            await after.close()
+        await self._cancel_run()
+        if generation != self._generation:
+            return  # a later play / seek superseded this one while we waited
+        self._run = asyncio.current_task()
+
+        began = time.perf_counter()
+        self.stream = stream = AudioStream(self.path, start=start, output=self.output)
+        self.scheduler = scheduler = PlaybackScheduler(stream.position, finished=stream.finished)
+        self.bind(scheduler, start)
+        self.state = "playing"
+        try:
+            stream.start()
+            scheduler.start()
+            # Opening the stream and binding every track, per (re)start
+            metrics.add_time("playback_start", time.perf_counter() - began)
+            while not stream.finished.is_set():
+                await asyncio.sleep(POLL_INTERVAL)
+            self.state = "finished"
+            self.resume_at = 0.0
+        finally:
+            if self.state == "playing":
+                self.resume_at = stream.position()
+            stream.stop()
+            # Joins the scheduler thread (one MAX_WAIT at most) and runs its
+            # on_finish cleanup before the stream it reads goes away
+            scheduler.stop()
+            stream.close()
+            self.stream = self.scheduler = None
+
+    # ------------------------
+    # CONTROL (call from the loop's thread, e.g. Tk callbacks)
+    # ------------------------
+    def play(self, start=0.0, after=None):
+        self._generation += 1
+        return self.loop.create_task(self._play(start, self._generation, after))
+
+    def position(self):
+        if self.stream is not None:
+            return self.stream.position()
+        return self.resume_at
+
+    def pause(self):
+        if self.state != "playing":
+            return None
+        self.resume_at = self.position()
+        self.state = "paused"
+        self._generation += 1
+        return self.loop.create_task(self._cancel_run())
+
+    def resume(self):
+        if self.state != "paused":
+            return None
+        return self.play(self.resume_at)
+
+    def seek(self, seconds):
+        seconds = max(0.0, seconds)
+        if self.state == "playing":
+            return self.play(seconds)
+        self.resume_at = seconds
+        return None
+
+    async def wait(self):
+        # Until the song ends or the session is closed; follows seeks
+        while self.state not in ("finished", "closed"):
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def close(self):
+        self.state = "closed"
+        self._generation += 1
+        for task in list(self._tasks):
+            task.cancel()
+        await self._cancel_run()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,434 @@
+# #######################################################
+# transcripts.db storage layer
+# - One shared, lock-guarded WAL connection per process
+# - Versioned schema migrations (PRAGMA user_version)
+# - Songs, words, melody chunks and notes in separate tables,
+#   indexed by hash and time, so edits touch only what changed
+# - File identity index used by fingerprint.py
+# - Haptic analysis and rendered timelines keyed by parameter set
+# - Partial transcripts (streaming transcription) remember how far
+#   they got, so an interrupted song resumes instead of restarting
+# #######################################################
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from melody_store import Melody, load_melody as decode_legacy_melody
+from notes import Notes
+from haptics import HapticTimeline
+
+
+DB_FILE = "transcripts.db"
+MELODY_CHUNK_SECONDS = 10.0
+
+_conn = None
+_conn_pid = None
+_lock = threading.RLock()
+
+
+# ------------------------
+# CONNECTION
+# ------------------------
+def connect():
+    global _conn, _conn_pid
+    with _lock:
+        # A forked worker (prepare.py's pool) must not share the parent's handle
+        if _conn is None or _conn_pid != os.getpid():
+            # Autocommit mode; transaction() issues BEGIN/COMMIT itself so
+            # migrations with DDL stay atomic.
+            conn = sqlite3.connect(DB_FILE, check_same_thread=False, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            migrate(conn)
+            _conn, _conn_pid = conn, os.getpid()
+        return _conn
+
+
+@contextmanager
+def _begin(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+@contextmanager
+def transaction():
+    with _lock:
+        with _begin(connect()) as conn:
+            yield conn
+
+
+def fetch_all(query, args=()):
+    with _lock:
+        return connect().execute(query, args).fetchall()
+
+
+def fetch_one(query, args=()):
+    with _lock:
+        return connect().execute(query, args).fetchone()
+
+
+def close():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
+# ------------------------
+# MIGRATIONS
+# ------------------------
+def _migrate_legacy_table(conn):
+    # The original single wide table, including databases created before
+    # melody_data / note_data existed.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS transcripts (
+            file_hash TEXT PRIMARY KEY,
+            filename TEXT,
+            transcript TEXT,
+            word_data TEXT
+        )
+    """)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(transcripts)")}
+    for column, kind in (("melody_data", "BLOB"), ("note_data", "BLOB"), ("note_params", "TEXT")):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE transcripts ADD COLUMN {column} {kind}")
+
+
+def _migrate_split_tables(conn):
+    conn.execute("""
+        CREATE TABLE songs (
+            file_hash TEXT PRIMARY KEY,
+            filename TEXT,
+            transcript TEXT,
+            updated_at REAL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE words (
+            file_hash TEXT NOT NULL REFERENCES songs(file_hash) ON DELETE CASCADE,
+            idx INTEGER NOT NULL,
+            start_time REAL NOT NULL,
+            end_time REAL NOT NULL,
+            word TEXT NOT NULL,
+            PRIMARY KEY (file_hash, idx)
+        )
+    """)
+    conn.execute("CREATE INDEX words_by_time ON words(file_hash, start_time)")
+    conn.execute("""
+        CREATE TABLE melody_chunks (
+            file_hash TEXT NOT NULL REFERENCES songs(file_hash) ON DELETE CASCADE,
+            chunk_start REAL NOT NULL,
+            chunk_end REAL NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (file_hash, chunk_start)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE notes (
+            file_hash TEXT PRIMARY KEY REFERENCES songs(file_hash) ON DELETE CASCADE,
+            params TEXT NOT NULL,
+            data BLOB NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS prepare_jobs (
+            file_hash TEXT PRIMARY KEY,
+            path TEXT,
+            status TEXT,
+            error TEXT,
+            updated_at REAL
+        )
+    """)
+
+    rows = conn.execute(
+        "SELECT file_hash, filename, transcript, word_data, melody_data, note_data, note_params FROM transcripts"
+    ).fetchall()
+    for file_hash, filename, transcript, word_data, melody_data, note_data, note_params in rows:
+        _write_song(conn, file_hash, filename, transcript)
+        _write_words(conn, file_hash, json.loads(word_data) if word_data else [])
+        melody = decode_legacy_melody(melody_data)
+        if melody is not None:
+            _write_melody(conn, file_hash, melody)
+        if note_data is not None and note_params is not None:
+            _write_notes(conn, file_hash, Notes.from_bytes(note_data), note_params)
+
+    conn.execute("DROP TABLE transcripts")
+
+
+def _migrate_file_index(conn):
+    # Path metadata -> content hash, so unchanged files are never re-read
+    conn.execute("""
+        CREATE TABLE file_index (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            quick_hash TEXT NOT NULL,
+            checked_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX file_index_by_quick_hash ON file_index(quick_hash)")
+
+
+def _migrate_haptic_cache(conn):
+    # Two stages, so changing PWM / duty settings only redoes the mapping:
+    # audio analysis (beats, pitch) keyed by analysis params, and the
+    # rendered timeline keyed by analysis + mapping params.
+    conn.execute("""
+        CREATE TABLE haptic_analysis (
+            file_hash TEXT NOT NULL,
+            params TEXT NOT NULL,
+            beats BLOB NOT NULL,
+            melody BLOB NOT NULL,
+            PRIMARY KEY (file_hash, params)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE haptic_timelines (
+            file_hash TEXT NOT NULL,
+            params TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (file_hash, params)
+        )
+    """)
+
+
+def _migrate_transcription_progress(conn):
+    # Seconds of audio transcribed so far; NULL once the transcript is complete
+    conn.execute("ALTER TABLE songs ADD COLUMN transcribed_until REAL")
+
+
+MIGRATIONS = [
+    _migrate_legacy_table,
+    _migrate_split_tables,
+    _migrate_file_index,
+    _migrate_haptic_cache,
+    _migrate_transcription_progress,
+]
+
+
+def migrate(conn):
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return
+    # Another process (prepare.py next to the player) may be migrating the
+    # same file: each step re-reads the version under the write lock and
+    # steps that already ran are skipped.
+    while True:
+        with _begin(conn):
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(MIGRATIONS):
+                return
+            MIGRATIONS[version](conn)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+
+
+# ------------------------
+# WRITERS (caller holds a transaction)
+# ------------------------
+def _write_song(conn, file_hash, filename, transcript):
+    conn.execute("""
+        INSERT INTO songs (file_hash, filename, transcript, updated_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(file_hash) DO UPDATE SET
+            filename=excluded.filename, transcript=excluded.transcript, updated_at=excluded.updated_at
+    """, (file_hash, filename, transcript, time.time()))
+
+
+def _write_words(conn, file_hash, word_data):
+    conn.execute("DELETE FROM words WHERE file_hash=?", (file_hash,))
+    conn.executemany(
+        "INSERT INTO words VALUES (?, ?, ?, ?, ?)",
+        [(file_hash, i, w["start"], w["end"], w["word"]) for i, w in enumerate(word_data)]
+    )
+
+
+def _write_melody(conn, file_hash, melody):
+    conn.execute("DELETE FROM melody_chunks WHERE file_hash=?", (file_hash,))
+    if not len(melody):
+        return
+
+    chunk_ids = np.floor(melody.times / MELODY_CHUNK_SECONDS).astype(np.int64)
+    bounds = np.flatnonzero(np.diff(chunk_ids)) + 1
+    rows = []
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(melody)]):
+        chunk = Melody(melody.times[lo:hi], melody.freqs[lo:hi])
+        rows.append((
+            file_hash,
+            float(chunk_ids[lo] * MELODY_CHUNK_SECONDS),
+            float((chunk_ids[lo] + 1) * MELODY_CHUNK_SECONDS),
+            chunk.to_bytes()
+        ))
+    conn.executemany("INSERT INTO melody_chunks VALUES (?, ?, ?, ?)", rows)
+
+
+def _write_notes(conn, file_hash, note_data, params_key):
+    conn.execute(
+        "INSERT OR REPLACE INTO notes VALUES (?, ?, ?)",
+        (file_hash, params_key, note_data.to_bytes())
+    )
+
+
+# ------------------------
+# PUBLIC API
+# ------------------------
+def init_db():
+    connect()
+
+
+def save_to_db(file_hash, filename, transcript, word_data, melody_data, transcribed_until=None):
+    with transaction() as conn:
+        _write_song(conn, file_hash, filename, transcript)
+        conn.execute("UPDATE songs SET transcribed_until=? WHERE file_hash=?", (transcribed_until, file_hash))
+        _write_words(conn, file_hash, word_data)
+        if melody_data is not None:
+            _write_melody(conn, file_hash, melody_data)
+        # Notes were compiled from the old melody; rebuilt on next play
+        conn.execute("DELETE FROM notes WHERE file_hash=?", (file_hash,))
+
+
+def load_from_db(file_hash):
+    row = fetch_one("SELECT transcript FROM songs WHERE file_hash=?", (file_hash,))
+    if not row:
+        return None, None, None
+    return row[0], load_words(file_hash), load_melody(file_hash)
+
+
+def save_words(file_hash, transcript, word_data):
+    # Transcript edits leave melody and notes untouched
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE songs SET transcript=?, updated_at=? WHERE file_hash=?",
+            (transcript, time.time(), file_hash)
+        )
+        _write_words(conn, file_hash, word_data)
+
+
+def append_words(file_hash, transcript, word_data, first, transcribed_until=None):
+    # Streaming transcription: words from index `first` on, plus progress
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE songs SET transcript=?, transcribed_until=?, updated_at=? WHERE file_hash=?",
+            (transcript, transcribed_until, time.time(), file_hash)
+        )
+        conn.execute("DELETE FROM words WHERE file_hash=? AND idx >= ?", (file_hash, first))
+        conn.executemany(
+            "INSERT INTO words VALUES (?, ?, ?, ?, ?)",
+            [(file_hash, first + i, w["start"], w["end"], w["word"]) for i, w in enumerate(word_data)]
+        )
+
+
+def transcription_progress(file_hash):
+    # None when the transcript is complete (or the song unknown)
+    row = fetch_one("SELECT transcribed_until FROM songs WHERE file_hash=?", (file_hash,))
+    return row[0] if row else None
+
+
+def load_words(file_hash, start=None, end=None):
+    query = "SELECT start_time, end_time, word FROM words WHERE file_hash=?"
+    args = [file_hash]
+    if start is not None:
+        query += " AND start_time >= ?"
+        args.append(start)
+    if end is not None:
+        query += " AND start_time < ?"
+        args.append(end)
+
+    rows = fetch_all(query + " ORDER BY idx", args)
+    return [{"start": s, "end": e, "word": w} for s, e, w in rows]
+
+
+def save_melody(file_hash, melody_data):
+    with transaction() as conn:
+        _write_melody(conn, file_hash, melody_data)
+        conn.execute("DELETE FROM notes WHERE file_hash=?", (file_hash,))
+
+
+def load_melody(file_hash, start=None, end=None):
+    query = "SELECT data FROM melody_chunks WHERE file_hash=?"
+    args = [file_hash]
+    if start is not None:
+        query += " AND chunk_end > ?"
+        args.append(start)
+    if end is not None:
+        query += " AND chunk_start <= ?"
+        args.append(end)
+
+    rows = fetch_all(query + " ORDER BY chunk_start", args)
+    if not rows:
+        return None
+
+    chunks = [Melody.from_bytes(row[0]) for row in rows]
+    melody = chunks[0] if len(chunks) == 1 else Melody(
+        np.concatenate([c.times for c in chunks]),
+        np.concatenate([c.freqs for c in chunks])
+    )
+    if start is not None or end is not None:
+        times, freqs = melody.window(
+            start if start is not None else -np.inf,
+            end if end is not None else np.inf
+        )
+        melody = Melody(times, freqs)
+    return melody
+
+
+def save_notes(file_hash, note_data, params_key):
+    with transaction() as conn:
+        _write_notes(conn, file_hash, note_data, params_key)
+
+
+def load_notes(file_hash, params_key):
+    row = fetch_one("SELECT data FROM notes WHERE file_hash=? AND params=?", (file_hash, params_key))
+    return Notes.from_bytes(row[0]) if row else None
+
+
+def save_haptic_analysis(file_hash, params_key, beat_times, melody):
+    with transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO haptic_analysis VALUES (?, ?, ?, ?)",
+            (file_hash, params_key, np.asarray(beat_times, dtype=np.float32).tobytes(), melody.to_bytes())
+        )
+
+
+def load_haptic_analysis(file_hash, params_key):
+    row = fetch_one(
+        "SELECT beats, melody FROM haptic_analysis WHERE file_hash=? AND params=?",
+        (file_hash, params_key)
+    )
+    if not row:
+        return None, None
+    return np.frombuffer(row[0], dtype=np.float32), Melody.from_bytes(row[1])
+
+
+def save_haptic_timeline(file_hash, params_key, timeline):
+    with transaction() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO haptic_timelines VALUES (?, ?, ?)",
+            (file_hash, params_key, timeline.to_bytes())
+        )
+
+
+def load_haptic_timeline(file_hash, params_key):
+    row = fetch_one(
+        "SELECT data FROM haptic_timelines WHERE file_hash=? AND params=?",
+        (file_hash, params_key)
+    )
+    return HapticTimeline.from_bytes(row[0]) if row else None
+
+
+def cached_hashes():
+    # Only complete transcripts; partial ones are picked up again
+    rows = fetch_all("SELECT file_hash FROM songs WHERE transcribed_until IS NULL")
+    return {row[0] for row in rows}
@@ -1,9 +1,22 @@
-import time
-import threading
+import os
+import sys
+import asyncio
 import numpy as np
-import librosa
-import sounddevice as sd
-import RPi.GPIO as GPIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from session import PlaybackSession
+from melody_store import Melody
+from fingerprint import get_file_hash
+from notes import params_key
+from storage import init_db, save_haptic_analysis, load_haptic_analysis, save_haptic_timeline, load_haptic_timeline
+import audio_loader
+import haptics
+import metrics
+import pitch
+import waveform
+from motor_control import init_motor, motor_off, stop_motor, MotorOutput
+
+ANALYSIS_SR = 16000  # beats and pitch run on the view speech recognition caches
 
 class HapticMusicPlayer:
     def __init__(
@@ -14,7 +27,11 @@ class HapticMusicPlayer:
         beat_duty=75,
         melody_min_duty=20,
         melody_max_duty=60,
-        beat_pulse_duration=0.08
+        beat_pulse_duration=0.08,
+        pitch_mode="fast",
+        actuator="auto",
+        output="events",
+        audio_output="device"
     ):
         self.audio_file = audio_file
         self.gpio_pin = gpio_pin
@@ -23,119 +40,145 @@ class HapticMusicPlayer:
         self.melody_min_duty = melody_min_duty
         self.melody_max_duty = melody_max_duty
         self.beat_pulse_duration = beat_pulse_duration
+        self.pitch_mode = pitch_mode
+        self.actuator = actuator
+        self.output = output  # "events" or "wave" (DMA pulse trains, see waveform.py)
+        self.audio_output = audio_output  # "device", or "null" for headless benchmarks
+        self.session = None
 
         self._setup_gpio()
-        self._analyze_audio()
+        init_db()
+        self.file_hash = get_file_hash(audio_file)
+        self._load_timeline()
 
     # -----------------------
     # Hardware setup
     # -----------------------
     def _setup_gpio(self):
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.gpio_pin, GPIO.OUT)
-        self.pwm = GPIO.PWM(self.gpio_pin, self.pwm_freq)
-        self.pwm.start(0)
+        # rpi / pigpio / sim, see actuators.py
+        self.pwm = init_motor(self.gpio_pin, self.pwm_freq, backend=self.actuator)
+
+    # -----------------------
+    # Cache keys
+    # -----------------------
+    def _analysis_params(self):
+        return {"pitch_mode": self.pitch_mode, "fmin": 80, "fmax": 800, "sr": ANALYSIS_SR}
+
+    def _mapping_params(self):
+        return dict(
+            self._analysis_params(),
+            pwm_freq=self.pwm_freq,
+            beat_duty=self.beat_duty,
+            melody_min_duty=self.melody_min_duty,
+            melody_max_duty=self.melody_max_duty,
+            beat_pulse_duration=self.beat_pulse_duration,
+            resolution=haptics.RESOLUTION
+        )
+
+    def _load_timeline(self):
+        key = params_key(self._mapping_params())
+        self.timeline = load_haptic_timeline(self.file_hash, key)
+        metrics.cache("haptic_timeline", self.timeline is not None)
+        if self.timeline is not None:
+            return
+
+        # Only the mapping changed: reuse the expensive audio analysis
+        analysis_key = params_key(self._analysis_params())
+        beat_times, melody = load_haptic_analysis(self.file_hash, analysis_key)
+        metrics.cache("haptic_analysis", beat_times is not None)
+        if beat_times is None:
+            beat_times, melody = self._analyze_audio()
+            save_haptic_analysis(self.file_hash, analysis_key, beat_times, melody)
+
+        with metrics.timer("haptic_render"):
+            self.timeline = self._map_haptics(beat_times, melody)
+        save_haptic_timeline(self.file_hash, key, self.timeline)
 
     # -----------------------
     # Audio analysis
     # -----------------------
     def _analyze_audio(self):
+        # Playback streams the file from disk; beats and pitch both run on
+        # the 16 kHz view audio_loader shares with speech recognition.
         print("Loading audio...")
-        self.y, self.sr = librosa.load(self.audio_file, sr=None, mono=True)
+        y, sr = audio_loader.load(self.audio_file, ANALYSIS_SR, file_hash=self.file_hash)
+
+        import librosa  # only needed on a cache miss
 
         print("Detecting beats...")
-        _, beat_frames = librosa.beat.beat_track(y=self.y, sr=self.sr)
-        self.beat_times = librosa.frames_to_time(beat_frames, sr=self.sr)
+        with metrics.timer("beat_tracking"):
+            _, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
+        beat_times = librosa.frames_to_time(beat_frames, sr=sr)
 
         print("Extracting melody...")
-        self.frame_length = 2048
-        self.hop_length = 256
-
-        pitches = librosa.yin(
-            self.y,
-            fmin=80,
-            fmax=800,
-            sr=self.sr,
-            frame_length=self.frame_length,
-            hop_length=self.hop_length
-        )
-
-        times = librosa.frames_to_time(
-            np.arange(len(pitches)),
-            sr=self.sr,
-            hop_length=self.hop_length
+        params = self._analysis_params()
+        times, pitches = pitch.track_pitch(
+            y,
+            sr,
+            pitch.pitch_config(params["pitch_mode"], sr=sr, fmin=params["fmin"], fmax=params["fmax"])
         )
+        audio_loader.forget(self.file_hash)
+        # Unvoiced frames stay as NaN so the mapping stage can see them
+        return beat_times, Melody(times, pitches)
 
+    # -----------------------
+    # Haptic mapping
+    # -----------------------
+    def _map_haptics(self, beat_times, melody):
         # Remove unvoiced frames
-        pitches = np.nan_to_num(pitches)
+        pitches = np.nan_to_num(melody.freqs)
 
-        # Normalize pitch → vibration intensity
+        # Normalize pitch → vibration intensity; no voiced frame, no melody
         voiced = pitches[pitches > 0]
-        p_min, p_max = voiced.min(), voiced.max()
-
-        self.melody_times = times
-        self.melody_duty = np.interp(
-            pitches,
-            [p_min, p_max],
-            [self.melody_min_duty, self.melody_max_duty]
+        if len(voiced):
+            melody_duty = np.interp(
+                pitches,
+                [voiced.min(), voiced.max()],
+                [self.melody_min_duty, self.melody_max_duty]
+            )
+        else:
+            melody_duty = np.zeros_like(pitches)
+
+        # Beats override the melody for the length of their pulse
+        return haptics.render(
+            [
+                haptics.melody_track(melody.times, melody_duty, priority=1),
+                haptics.beat_track(beat_times, self.beat_duty, self.beat_pulse_duration, priority=2),
+            ],
+            self.pwm_freq
         )
 
-    # -----------------------
-    # Melody vibration loop
-    # -----------------------
-    def _melody_loop(self, start_time):
-        for t, duty in zip(self.melody_times, self.melody_duty):
-            target = start_time + t
-            now = time.monotonic()
-            if target > now:
-                time.sleep(target - now)
-
-            self.pwm.ChangeDutyCycle(duty)
-
-    # -----------------------
-    # Beat pulse loop
-    # -----------------------
-    def _beat_loop(self, start_time):
-        for bt in self.beat_times:
-            target = start_time + bt
-            now = time.monotonic()
-            if target > now:
-                time.sleep(target - now)
-
-            self.pwm.ChangeDutyCycle(self.beat_duty)
-            time.sleep(self.beat_pulse_duration)
-
     # -----------------------
     # Public API
     # -----------------------
-    def play(self):
+    def bind_tracks(self, scheduler, start):
+        # Called by the session for every (re)start: play, resume, seek
+        if self.output == "wave" and waveform.supports_waves(self.pwm):
+            player = waveform.WavePlayer(self.timeline, waveform.wave_driver(self.pwm), self.pwm.pin)
+            scheduler.schedule(start, "motor", player.start, start)
+            scheduler.on_finish(player.stop)
+        else:
+            self.timeline.schedule(scheduler, MotorOutput(self.pwm), start)
+        scheduler.on_finish(motor_off, self.pwm)
+
+    async def play_async(self, start=0.0):
+        # Non-blocking: pause / resume / seek via self.session while it runs,
+        # cancel the task to stop
+        self.session = PlaybackSession(self.audio_file, self.bind_tracks, output=self.audio_output)
         try:
-            print("Starting haptic playback...")
-            start_time = time.monotonic()
-
-            melody_thread = threading.Thread(
-                target=self._melody_loop,
-                args=(start_time,),
-                daemon=True
-            )
-
-            beat_thread = threading.Thread(
-                target=self._beat_loop,
-                args=(start_time,),
-                daemon=True
-            )
-
-            melody_thread.start()
-            beat_thread.start()
-
-            sd.play(self.y, self.sr)
-            sd.wait()
+            self.session.play(start)
+            await self.session.wait()
+        finally:
+            await self.session.close()
 
+    def play(self, start=0.0):
+        # Blocking wrapper for scripts; start is a cue point in seconds
+        try:
+            print("Starting haptic playback...")
+            asyncio.run(self.play_async(start))
         finally:
             self.stop()
 
     def stop(self):
-        self.pwm.ChangeDutyCycle(0)
-        self.pwm.stop()
-        GPIO.cleanup()
+        stop_motor(self.pwm)
         print("Playback finished.")
@@ -1,11 +1,11 @@
-import HapticMusicPlayer
+from HapticMusicPlayer import HapticMusicPlayer
 
 def main():
     # Create a HapticMusicPlayer object
-    player = HapticMusicPlayer(file="song.mp3")
+    player = HapticMusicPlayer(audio_file="song.mp3")
     
     # Play the song
     player.play()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
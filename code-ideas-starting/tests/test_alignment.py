@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from alignment import align_words
+
+
+CACHED = [
+    {"start": 12.0, "end": 12.5, "word": "sweet"},
+    {"start": 12.6, "end": 13.2, "word": "caroline"},
+]
+
+
+def assert_ordered(aligned):
+    starts = [w["start"] for w in aligned]
+    assert starts == sorted(starts)
+    for word in aligned:
+        assert word["start"] >= 0.0
+        assert word["end"] >= word["start"]
+    for before, after in zip(aligned, aligned[1:]):
+        assert before["end"] <= after["start"] + 1e-9
+
+
+@pytest.mark.parametrize("edited", [
+    "hands touching hands sweet caroline",         # prepended
+    "sweet caroline bah bah bah",                  # appended
+    "sweet carolina",                              # replaced
+    "sweet good times never seemed so good caroline",  # inserted, no room
+    "touching you sweet carolina oh",              # all of the above
+])
+def test_aligned_words_stay_in_order(edited):
+    aligned = align_words(CACHED, edited)
+    assert [w["word"] for w in aligned] == edited.split()
+    assert_ordered(aligned)
+
+
+def test_prepended_words_end_at_first_anchor():
+    aligned = align_words(CACHED, "hands touching hands sweet caroline")
+    assert aligned[2]["end"] == pytest.approx(12.0)
+    assert aligned[3]["start"] == pytest.approx(12.0)
+
+
+def test_prepended_words_near_song_start():
+    cached = [{"start": 0.1, "end": 0.5, "word": "sweet"}]
+    aligned = align_words(cached, "so good so good sweet")
+    assert_ordered(aligned)
+    assert aligned[-1]["start"] == pytest.approx(0.1)
+
+
+def test_anchors_keep_cached_timings():
+    aligned = align_words(CACHED, "sweet carolina")
+    assert (aligned[0]["start"], aligned[0]["end"]) == (12.0, 12.5)
+    assert (aligned[1]["start"], aligned[1]["end"]) == (12.6, 13.2)
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import haptics
+from melody_store import Melody
+
+
+def state_at(timeline, t):
+    i = int(np.searchsorted(timeline.times, t, side="right")) - 1
+    return float(timeline.duties[i]), float(timeline.freqs[i])
+
+
+def test_no_tracks_renders_a_single_idle_point():
+    timeline = haptics.render([], 100)
+    assert len(timeline) == 1
+    assert state_at(timeline, 0.0) == (0.0, 100.0)
+
+    empty = haptics.melody_track([], [])
+    assert len(haptics.render([empty], 100)) == 1
+
+
+def test_timeline_keeps_only_change_points():
+    track = haptics.HapticTrack("notes", [0.1, 0.5], 0.2, 50, freqs=[150, 200])
+    timeline = haptics.render([track], 100)
+    assert len(timeline) == 5  # idle, note, idle, note, idle
+    assert state_at(timeline, 0.2) == (50.0, 150.0)
+    assert state_at(timeline, 0.4) == (0.0, 150.0)  # idle motor keeps its frequency
+    assert state_at(timeline, 0.6) == (50.0, 200.0)
+    assert state_at(timeline, 1.0)[0] == 0.0
+
+
+def test_higher_priority_wins_while_held():
+    melody = haptics.melody_track([0.0, 0.5], [30, 30], priority=1)
+    beat = haptics.beat_track([0.2], 75, 0.1, priority=2, release=0.0)
+    timeline = haptics.render([beat, melody], 100)
+    assert state_at(timeline, 0.1)[0] == 30.0
+    assert state_at(timeline, 0.25)[0] == 75.0
+    assert state_at(timeline, 0.35)[0] == 30.0
+
+
+def test_timeline_round_trips_bytes():
+    timeline = haptics.render([haptics.beat_track([0.0, 0.5], 60, 0.1)], 100)
+    again = haptics.HapticTimeline.from_bytes(timeline.to_bytes())
+    assert again.times.tolist() == timeline.times.tolist()
+    assert again.duties.tolist() == timeline.duties.tolist()
+
+
+def test_all_unvoiced_melody_maps_to_beats_only():
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "testing"))
+    from HapticMusicPlayer import HapticMusicPlayer
+
+    player = object.__new__(HapticMusicPlayer)
+    player.melody_min_duty, player.melody_max_duty = 20, 60
+    player.beat_duty, player.beat_pulse_duration = 75, 0.08
+    player.pwm_freq = 200
+
+    times = np.arange(0.0, 1.0, 0.02)
+    timeline = player._map_haptics(np.array([0.5]), Melody(times, np.full(len(times), np.nan)))
+    assert state_at(timeline, 0.2)[0] == 0.0
+    assert state_at(timeline, 0.52)[0] == 75.0
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import metrics
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def family_lines(text, family):
+    # (TYPE line indexes, sample line indexes) of one metric family
+    lines = text.splitlines()
+    types = [i for i, line in enumerate(lines) if line.startswith(f"# TYPE {family} ")]
+    samples = [
+        i for i, line in enumerate(lines)
+        if not line.startswith("#") and line.split("{")[0].split(" ")[0] in (
+            family, f"{family}_sum", f"{family}_count", f"{family}_bucket")
+    ]
+    return types, samples
+
+
+def assert_grouped(text, family):
+    types, samples = family_lines(text, family)
+    assert len(types) == 1
+    assert samples and samples == list(range(types[0] + 1, types[0] + 1 + len(samples)))
+
+
+def test_each_family_has_one_type_line_before_its_samples(enabled):
+    metrics.add_time("pitch", 0.2, algorithm="yin")
+    metrics.add_time("pitch", 0.1, algorithm="pyin")
+    metrics.cache("pcm_disk", True)
+    metrics.cache("notes", True)
+    metrics.lateness("word", 0.001)
+    metrics.lateness("motor", 0.003)
+
+    text = metrics.to_prometheus()
+    for family in ("feeld_stage_seconds", "feeld_stage_seconds_max",
+                   "feeld_cache_hits_total", "feeld_event_lateness_seconds"):
+        assert_grouped(text, family)
+    assert text.count("feeld_stage_seconds_sum{") == 2
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    metrics.reset()
+    metrics.add_time("pitch", 0.2)
+    metrics.count("wave_underruns")
+    assert metrics.snapshot() == {"timers": [], "counters": [], "lateness": {}}
@@ -0,0 +1,78 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import storage
+from melody_store import Melody
+from notes import compile_notes, Notes
+
+pytest.importorskip("scipy")
+
+
+FRAME = 0.02
+
+
+def melody(*segments):
+    # (start, end, hz) runs of frames; hz None leaves the frames unvoiced
+    times, freqs = [], []
+    for start, end, hz in segments:
+        t = np.arange(start, end, FRAME)
+        times.extend(t)
+        freqs.extend(np.full(len(t), np.nan if hz is None else hz))
+    return Melody(times, freqs)
+
+
+def test_empty_melody_has_no_notes():
+    assert len(compile_notes(Melody.empty())) == 0
+
+
+def test_all_unvoiced_melody_has_no_notes():
+    assert len(compile_notes(melody((0.0, 2.0, None)))) == 0
+    assert len(compile_notes(Melody([0.0, 0.02, 0.04], [0.0, 0.0, 0.0]))) == 0
+
+
+def test_steady_pitch_is_one_note():
+    notes = compile_notes(melody((1.0, 2.0, 440.0)))
+    assert len(notes) == 1
+    assert notes.onsets[0] == pytest.approx(1.0)
+    assert notes.ends[0] == pytest.approx(2.0, abs=FRAME)
+    assert notes.freqs[0] == pytest.approx(440.0, rel=1e-3)
+
+
+def test_pitch_jump_and_gap_split_notes():
+    notes = compile_notes(melody((0.0, 0.5, 220.0), (0.5, 1.0, 330.0), (1.0, 1.2, None), (1.2, 1.6, 330.0)))
+    assert len(notes) == 3
+    assert notes.freqs.tolist() == pytest.approx([220.0, 330.0, 330.0], rel=1e-3)
+    assert np.all(notes.onsets[1:] >= notes.ends[:-1] - 1e-6)
+
+
+def test_blip_merges_into_previous_note():
+    notes = compile_notes(melody((0.0, 0.5, 220.0), (0.5, 0.54, 440.0)))
+    assert len(notes) == 1
+    assert notes.ends[0] == pytest.approx(0.56, abs=1e-6)
+
+
+def test_note_across_stored_chunk_edge_stays_whole(tmp_path, monkeypatch):
+    # Melody is stored in MELODY_CHUNK_SECONDS chunks; a note held over a
+    # chunk boundary must come back as one note
+    monkeypatch.setattr(storage, "DB_FILE", str(tmp_path / "transcripts.db"))
+    storage.close()
+    edge = storage.MELODY_CHUNK_SECONDS
+    storage.save_to_db("abc", "song.mp3", "", [], melody((edge - 0.5, edge + 0.5, 330.0)))
+    loaded = storage.load_melody("abc")
+    storage.close()
+
+    notes = compile_notes(loaded)
+    assert len(notes) == 1
+    assert notes.onsets[0] == pytest.approx(edge - 0.5, abs=1e-4)
+    assert notes.ends[0] == pytest.approx(edge + 0.5, abs=FRAME + 1e-4)
+
+
+def test_notes_round_trip_bytes():
+    notes = compile_notes(melody((0.0, 0.5, 220.0), (0.5, 1.0, 330.0)))
+    again = Notes.from_bytes(notes.to_bytes())
+    assert again.onsets.tolist() == notes.onsets.tolist()
+    assert again.freqs.tolist() == notes.freqs.tolist()
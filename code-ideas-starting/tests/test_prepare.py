@@ -0,0 +1,17 @@
+import os
+import sys
+import subprocess
+
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def test_prepare_imports_without_tkinter():
+    # Headless batch jobs (a Pi or CI box with no display) must not need the UI
+    code = (
+        "import sys; sys.modules['tkinter'] = None; "
+        f"sys.path.insert(0, {HERE!r}); "
+        "import prepare; "
+        "assert 'lyric_player' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,124 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from event_index import EventIndex
+from scheduler import PlaybackScheduler
+
+
+WORDS = [
+    {"start": 1.0, "end": 1.8, "word": "sweet"},
+    {"start": 2.0, "end": 2.9, "word": "caroline"},
+    {"start": 4.0, "end": 4.5, "word": "oh"},
+]
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def run(scheduler, clock):
+    # Everything queued is due; finished=None ends the run once it drains
+    clock.now = float("inf")
+    scheduler.start()
+    scheduler.join(timeout=5)
+
+
+def play_words(start, carry):
+    clock = Clock()
+    scheduler = PlaybackScheduler(clock)
+    fired = []
+    scheduler.add_track("word", EventIndex.from_words(WORDS), fired.append, start, carry=carry)
+    first_at = scheduler._heap[0][0] if scheduler._heap else None
+    run(scheduler, clock)
+    return fired, first_at
+
+
+# ------------------------
+# EVENT INDEX
+# ------------------------
+def test_from_words_lookup():
+    index = EventIndex.from_words(WORDS)
+    assert len(index) == 3
+    assert index.index_at(0.5) == -1
+    assert index.index_at(1.0) == 0
+    assert index.index_at(3.0) == 1
+    assert index.index_at(9.0) == 2
+    assert index.first_from(1.0) == 0
+    assert index.first_from(1.5) == 1
+    assert index.first_from(9.0) == 3
+    assert index.window(1.5, 4.0) == (1, 2)
+
+
+def test_empty_index():
+    index = EventIndex.from_words([])
+    assert len(index) == 0
+    assert index.index_at(1.0) == -1
+    assert index.first_from(1.0) == 0
+
+
+# ------------------------
+# TRACKS
+# ------------------------
+@pytest.mark.parametrize("start, carry, fired, first_at", [
+    (0.0, True, [0, 1, 2], 1.0),     # before the first word: nothing to carry
+    (1.5, True, [0, 1, 2], 1.5),     # mid-word: the sung word fires at the cue point
+    (1.5, False, [1, 2], 2.0),       # mid-word without carry: next word only
+    (2.0, True, [1, 2], 2.0),        # exactly on a word: fired once, on time
+    (9.0, True, [2], 9.0),           # past the end: the last word stays lit
+    (9.0, False, [], None),
+])
+def test_add_track_from_cue_point(start, carry, fired, first_at):
+    assert play_words(start, carry) == (fired, first_at)
+
+
+def test_streamed_words_continue_global_indices():
+    # What LyricPlayer.add_words does: only the new words go on the
+    # scheduler, from the current clock, offset by the words before them
+    clock = Clock(0.0)
+    scheduler = PlaybackScheduler(clock)
+    fired = []
+    scheduler.add_track("word", EventIndex.from_words(WORDS[:2]), fired.append, 0.0, carry=True)
+
+    clock.now = 4.2
+    first = 2
+    more = WORDS[2:] + [{"start": 5.0, "end": 5.5, "word": "so"}]
+    scheduler.add_track("word", EventIndex.from_words(more), lambda i: fired.append(first + i),
+                        clock(), carry=True)
+    run(scheduler, clock)
+    assert fired == [0, 1, 2, 3]
+
+
+def test_lyric_player_add_words_offsets():
+    pytest.importorskip("tkinter")
+    import lyric_player
+
+    class Lyrics:
+        def __init__(self):
+            self.requested = []
+            self.text = ""
+
+        def extend(self, text):
+            self.text = f"{self.text} {text}".strip()
+
+        def request(self, index):
+            self.requested.append(index)
+
+    clock = Clock(4.2)
+    scheduler = PlaybackScheduler(clock)
+    player = object.__new__(lyric_player.LyricPlayer)
+    player.word_data = list(WORDS[:2])
+    player.lyrics = Lyrics()
+    player.session = type("Session", (), {"scheduler": scheduler})()
+
+    player.add_words(WORDS[2:])
+    run(scheduler, clock)
+    assert player.lyrics.requested == [2]
+    assert player.lyrics.text == "oh"
+    assert len(player.word_data) == 3
@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import storage
+
+
+WORDS = [
+    {"start": 1.0, "end": 1.4, "word": "sweet"},
+    {"start": 1.5, "end": 2.1, "word": "caroline"},
+]
+MELODY = [{"time": 0.5, "freq": 220.0}, {"time": 12.5, "freq": 440.0}]
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "transcripts.db")
+    monkeypatch.setattr(storage, "DB_FILE", path)
+    storage.close()
+    yield path
+    storage.close()
+
+
+def make_legacy(path, with_melody):
+    # The original wide table: 4 columns, or 5 with JSON melody_data
+    conn = sqlite3.connect(path)
+    columns = "file_hash TEXT PRIMARY KEY, filename TEXT, transcript TEXT, word_data TEXT"
+    conn.execute(f"CREATE TABLE transcripts ({columns}{', melody_data TEXT' if with_melody else ''})")
+    row = ["abc", "song.mp3", "sweet caroline", json.dumps(WORDS)]
+    if with_melody:
+        row.append(json.dumps(MELODY))
+    conn.execute(f"INSERT INTO transcripts VALUES ({', '.join('?' * len(row))})", row)
+    conn.commit()
+    conn.close()
+
+
+@pytest.mark.parametrize("with_melody", [False, True])
+def test_legacy_table_migrates_to_latest(db_file, with_melody):
+    make_legacy(db_file, with_melody)
+    storage.init_db()
+
+    version = storage.fetch_one("PRAGMA user_version")[0]
+    assert version == len(storage.MIGRATIONS)
+
+    transcript, word_data, melody = storage.load_from_db("abc")
+    assert transcript == "sweet caroline"
+    assert word_data == WORDS
+    assert storage.cached_hashes() == {"abc"}
+    if with_melody:
+        loaded = storage.load_melody("abc")
+        assert np.allclose(loaded.times, [0.5, 12.5])
+        assert np.allclose(loaded.freqs, [220.0, 440.0])
+        assert np.allclose(melody.freqs, loaded.freqs)
+    else:
+        assert melody is None and storage.load_melody("abc") is None
+
+
+def open_db(path):
+    storage.DB_FILE = path
+    storage.init_db()
+    return storage.fetch_one("PRAGMA user_version")[0]
+
+
+def test_concurrent_processes_migrate_once(db_file):
+    make_legacy(db_file, with_melody=True)
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        versions = list(pool.map(open_db, [db_file] * 8))
+    assert versions == [len(storage.MIGRATIONS)] * 8
+
+    storage.init_db()
+    assert storage.cached_hashes() == {"abc"}
+    assert storage.load_words("abc") == WORDS
@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from haptics import HapticTimeline
+from waveform import SimulatedWaveDriver, WavePlayer
+
+
+PULSES = [(1, 0, 50000), (0, 1, 50000)]  # 0.1 s
+
+
+def test_second_pending_send_replaces_the_first():
+    driver = SimulatedWaveDriver(18)
+    first, second, third = (driver.add(PULSES) for _ in range(3))
+    driver.send(first)
+    driver.send(second)
+    driver.send(third)  # ONE_SHOT_SYNC keeps a single pending wave
+    assert driver.current() == first
+    assert driver.pending == third
+
+
+def test_pending_wave_starts_where_the_playing_one_ends():
+    driver = SimulatedWaveDriver(18)
+    first, second = driver.add(PULSES), driver.add(PULSES)
+    driver.send(first)
+    driver.send(second)
+    driver._advance(driver.playing[2] + 0.01)
+    assert driver.current() == second
+    (start_a, _), (start_b, _) = driver.sent
+    assert abs(start_b - start_a - 0.1) < 1e-9
+
+
+def test_player_plays_every_chunk_back_to_back():
+    timeline = HapticTimeline([0.0, 0.3], [50, 0], [100, 100])
+    driver = SimulatedWaveDriver(18)
+    player = WavePlayer(timeline, driver, 18, chunk=0.1)
+    player.start()
+    player._thread.join(timeout=5)
+    player.stop()
+
+    starts = [start for start, _ in driver.sent]
+    assert len(starts) == player.refills >= 4
+    assert all(abs(b - a - 0.1) < 1e-6 for a, b in zip(starts, starts[1:]))
+    assert player.underruns == 0
+    assert player.queued == [] and driver.waves == {}
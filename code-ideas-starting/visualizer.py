@@ -0,0 +1,127 @@
+# #######################################################
+# Windowed melody visualizer
+# - Cursor into the time-sorted melody arrays (no full scans)
+# - Fixed scrolling window drawn as one reusable polyline
+# - Canvas item count stays constant for the whole song
+# - Frame-time metrics to check it holds 60fps on the Pi
+# #######################################################
+
+import time
+import tkinter as tk
+from collections import deque
+
+import numpy as np
+
+from melody_store import Melody
+
+
+WINDOW_SECONDS = 4.0     # seconds of melody on screen
+NOW_POSITION = 0.75      # where "now" sits across the canvas
+FRAME_INTERVAL = 16      # ms between Tk redraws (~60fps)
+MAX_POINTS = 400         # polyline vertices per frame
+STATS_FRAMES = 600
+
+
+class MelodyVisualizer:
+    def __init__(self, root, melody_data, window_seconds=WINDOW_SECONDS):
+        self.root = root
+        self.melody_data = melody_data if melody_data is not None else Melody.empty()
+        self.window_seconds = window_seconds
+
+        self.canvas_height = 200
+        self.canvas = tk.Canvas(root, bg="black", height=self.canvas_height, highlightthickness=0)
+        self.canvas.pack(fill="x")
+
+        self.min_freq, self.max_freq = self.melody_data.freq_range()
+
+        # The only two items this canvas ever holds
+        self.line = self.canvas.create_line(0, 0, 0, 0, fill="yellow", width=3)
+        self.now_marker = self.canvas.create_line(0, 0, 0, self.canvas_height, fill="gray30")
+
+        self.cursor = 0
+        self.last_now = 0.0
+        self._pending = None
+        self._drawn = None
+
+        self.render_times = deque(maxlen=STATS_FRAMES)
+        self.frame_intervals = deque(maxlen=STATS_FRAMES)
+        self._last_frame = None
+        self._running = True
+
+        self.root.after(FRAME_INTERVAL, self._flush)
+
+    # ------------------------
+    # DRAW
+    # ------------------------
+    def _window_indices(self, now, start, end):
+        times = self.melody_data.times
+        if now < self.last_now:
+            self.cursor = 0  # jumped backwards; fall back to a full bisect
+        lo = self.cursor + int(np.searchsorted(times[self.cursor:], start))
+        hi = lo + int(np.searchsorted(times[lo:], end))
+        self.cursor = lo
+        return lo, hi
+
+    def render(self, now):
+        began = time.perf_counter()
+
+        width = self.canvas.winfo_width() or 1
+        start = now - self.window_seconds * NOW_POSITION
+        end = start + self.window_seconds
+        lo, hi = self._window_indices(now, start, end)
+        self.last_now = now
+
+        times = self.melody_data.times[lo:hi]
+        freqs = self.melody_data.freqs[lo:hi]
+        if len(times) > MAX_POINTS:
+            step = -(-len(times) // MAX_POINTS)
+            times, freqs = times[::step], freqs[::step]
+
+        if len(times) >= 2:
+            y_range = max(self.max_freq - self.min_freq, 1)
+            xs = (times - start) / self.window_seconds * width
+            ys = self.canvas_height - (freqs - self.min_freq) / y_range * self.canvas_height
+            self.canvas.coords(self.line, *np.column_stack([xs, ys]).ravel().tolist())
+        else:
+            self.canvas.coords(self.line, 0, 0, 0, 0)
+
+        marker_x = width * NOW_POSITION
+        self.canvas.coords(self.now_marker, marker_x, 0, marker_x, self.canvas_height)
+
+        self.render_times.append(time.perf_counter() - began)
+
+    # ------------------------
+    # FRAME LOOP
+    # ------------------------
+    def request(self, now):
+        # Safe from any thread: the Tk loop draws the newest time
+        self._pending = now
+
+    def _flush(self):
+        if not self._running:
+            return
+        now = self._pending
+        if now is not None and now != self._drawn:
+            frame_start = time.perf_counter()
+            if self._last_frame is not None:
+                self.frame_intervals.append(frame_start - self._last_frame)
+            self._last_frame = frame_start
+            self.render(now)
+            self._drawn = now
+        self.root.after(FRAME_INTERVAL, self._flush)
+
+    def stop(self):
+        self._running = False
+
+    def frame_stats(self):
+        if not self.render_times:
+            return {"frames": 0}
+        render = sorted(self.render_times)
+        stats = {
+            "frames": len(render),
+            "render_ms_mean": 1000 * sum(render) / len(render),
+            "render_ms_p95": 1000 * render[int(0.95 * (len(render) - 1))],
+        }
+        if self.frame_intervals:
+            stats["fps"] = len(self.frame_intervals) / sum(self.frame_intervals)
+        return stats
@@ -0,0 +1,253 @@
+# #######################################################
+# Hardware-timed haptic output (pigpio DMA waveforms)
+# - Haptic timeline compiled into short pulse-train chunks
+# - ONE_SHOT_SYNC holds one wave behind the one playing: Python
+#   wakes up a few times per chunk, sends the next chunk once the
+#   pending one has started, and deletes a wave only after the
+#   transmitter has moved past it
+# - Edges sit at absolute microsecond offsets, so PWM phase
+#   carries across chunk boundaries without drift
+# - Simulated wave driver with the same interface, for
+#   bench_motor.py off the Pi
+# #######################################################
+
+import math
+import threading
+import time
+
+import numpy as np
+
+import metrics
+from actuators import PigpioActuator, SimulatedActuator
+
+
+CHUNK_SECONDS = 0.25   # audio time covered by one DMA wave
+REFILL_INTERVAL = 0.05 # seconds between refill checks, well under a chunk
+
+
+# ------------------------
+# COMPILE
+# ------------------------
+def _segment_edges(anchor, start, end, duty, freq):
+    # Rising / falling edges (seconds) of the PWM periods overlapping
+    # [start, end), counted from the segment's anchor so a segment cut
+    # by chunk boundaries stays in phase.
+    period = 1.0 / freq
+    first = int(math.floor((start - anchor) / period))
+    last = int(math.ceil((end - anchor) / period))
+    rises = anchor + np.arange(first, last) * period
+    falls = rises + duty / 100.0 * period
+    keep = (falls > start) & (rises < end)
+    return np.maximum(rises[keep], start), np.minimum(falls[keep], end)
+
+
+def compile_chunk(timeline, start, end, pin):
+    # Pulses (gpio_on_mask, gpio_off_mask, delay_us) covering [start, end)
+    mask = 1 << pin
+    times = timeline.times.astype(np.float64)
+    bounds = np.append(times[1:], np.inf)
+
+    lo = max(int(np.searchsorted(times, start, side="right")) - 1, 0)
+    hi = int(np.searchsorted(times, end))
+
+    edges = []  # (time, level)
+    for i in range(lo, hi):
+        seg_start = max(times[i], start)
+        seg_end = min(bounds[i], end)
+        if seg_end <= seg_start:
+            continue
+        duty = float(timeline.duties[i])
+        if duty <= 0 or duty >= 100:
+            edges.append((seg_start, int(duty >= 100)))
+            continue
+
+        rises, falls = _segment_edges(times[i], seg_start, seg_end, duty, float(timeline.freqs[i]))
+        if not len(rises) or rises[0] > seg_start:
+            edges.append((seg_start, 0))
+        for r, f in zip(rises.tolist(), falls.tolist()):
+            edges.append((r, 1))
+            edges.append((f, 0))
+
+    if not edges:
+        edges.append((start, 0))
+
+    # Absolute microseconds, so rounding never accumulates
+    pulses = []
+    offsets = [int(round((t - start) * 1e6)) for t, _ in edges] + [int(round((end - start) * 1e6))]
+    for (_, level), t0, t1 in zip(edges, offsets, offsets[1:]):
+        if t1 <= t0:
+            continue
+        on, off = (mask, 0) if level else (0, mask)
+        if pulses and pulses[-1][0] == on and pulses[-1][1] == off:
+            pulses[-1] = (on, off, pulses[-1][2] + t1 - t0)
+        else:
+            pulses.append((on, off, t1 - t0))
+    return pulses
+
+
+# ------------------------
+# DRIVERS
+# ------------------------
+class PigpioWaveDriver:
+    def __init__(self, pi, pin):
+        import pigpio
+
+        self.pigpio = pigpio
+        self.pi = pi
+        self.pin = pin
+        pi.hardware_PWM(pin, 0, 0)
+        pi.set_mode(pin, pigpio.OUTPUT)
+        pi.wave_clear()
+
+    def add(self, pulses):
+        self.pi.wave_add_generic([self.pigpio.pulse(on, off, delay) for on, off, delay in pulses])
+        return self.pi.wave_create()
+
+    def send(self, wave_id):
+        # Starts as soon as the playing wave finishes; pigpio keeps only
+        # one such pending wave
+        self.pi.wave_send_using_mode(wave_id, self.pigpio.WAVE_MODE_ONE_SHOT_SYNC)
+
+    def current(self):
+        wave_id = self.pi.wave_tx_at()
+        return None if wave_id in (self.pigpio.NO_TX_WAVE, self.pigpio.WAVE_NOT_FOUND) else wave_id
+
+    def delete(self, wave_id):
+        self.pi.wave_delete(wave_id)
+
+    def stop(self):
+        self.pi.wave_tx_stop()
+        self.pi.wave_clear()
+        self.pi.write(self.pin, 0)
+
+
+class SimulatedWaveDriver:
+    # Plays waves against the wall clock and keeps every pulse it sent.
+    # Like ONE_SHOT_SYNC on pigpio, one wave plays and one waits; a
+    # second send while one is pending replaces it.
+    def __init__(self, pin):
+        self.pin = pin
+        self.waves = {}
+        self.playing = None   # (wave id, start, end) in perf_counter time
+        self.pending = None   # wave id that starts when `playing` ends
+        self.sent = []        # (start, pulses) per transmitted wave
+        self._ids = 0
+
+    def add(self, pulses):
+        self._ids += 1
+        self.waves[self._ids] = pulses
+        return self._ids
+
+    def _transmit(self, wave_id, start):
+        pulses = self.waves[wave_id]
+        self.playing = (wave_id, start, start + sum(p[2] for p in pulses) / 1e6)
+        self.sent.append((start, pulses))
+
+    def _advance(self, now):
+        if self.playing is not None and self.playing[2] <= now:
+            ended = self.playing[2]
+            self.playing = None
+            if self.pending is not None:
+                self._transmit(self.pending, ended)
+                self.pending = None
+                self._advance(now)
+
+    def send(self, wave_id):
+        now = time.perf_counter()
+        self._advance(now)
+        if self.playing is None:
+            self._transmit(wave_id, now)
+        else:
+            self.pending = wave_id
+
+    def current(self):
+        self._advance(time.perf_counter())
+        return self.playing[0] if self.playing is not None else None
+
+    def delete(self, wave_id):
+        del self.waves[wave_id]
+
+    def stop(self):
+        self.playing = self.pending = None
+
+
+def supports_waves(pwm):
+    return isinstance(pwm, (PigpioActuator, SimulatedActuator))
+
+
+def wave_driver(pwm):
+    if isinstance(pwm, PigpioActuator):
+        return PigpioWaveDriver(pwm.pi, pwm.pin)
+    return SimulatedWaveDriver(pwm.pin)
+
+
+# ------------------------
+# PLAYER
+# ------------------------
+class WavePlayer:
+    def __init__(self, timeline, driver, pin, chunk=CHUNK_SECONDS):
+        self.timeline = timeline
+        self.driver = driver
+        self.pin = pin
+        self.chunk = chunk
+        self.end = float(timeline.times[-1]) + chunk if len(timeline) else 0.0
+
+        self.next_start = 0.0
+        self.queued = []  # sent and not yet deleted: playing, then pending
+        self.refills = 0
+        self.underruns = 0
+        self.python_seconds = 0.0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _queue_next(self):
+        began = time.perf_counter()
+        pulses = compile_chunk(self.timeline, self.next_start, self.next_start + self.chunk, self.pin)
+        wave_id = self.driver.add(pulses)
+        self.driver.send(wave_id)
+        self.queued.append(wave_id)
+        self.next_start += self.chunk
+        self.refills += 1
+        self.python_seconds += time.perf_counter() - began
+
+    def start(self, at=0.0):
+        # The first wave goes out now and covers timeline time `at` onwards
+        self.next_start = at
+        self._fill()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        # One wave playing plus one pending is all ONE_SHOT_SYNC can hold
+        while len(self.queued) < 2 and self.next_start < self.end:
+            self._queue_next()
+
+    def _run(self):
+        while not self._stop.wait(REFILL_INTERVAL):
+            playing = self.driver.current()
+            if playing is None:
+                # Transmitter idle: every wave sent so far has finished
+                while self.queued:
+                    self.driver.delete(self.queued.pop(0))
+                if self.next_start >= self.end:
+                    break
+                self.underruns += 1  # the pending slot ran dry: there was a gap
+                metrics.count("wave_underruns")
+            elif playing != self.queued[0]:
+                # The pending wave has started; the one before it is done
+                self.driver.delete(self.queued.pop(0))
+            self._fill()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.driver.stop()
+
+    def report(self):
+        return {
+            "chunks": self.refills,
+            "underruns": self.underruns,
+            "python_ms_per_second": 1000 * self.python_seconds / max(self.refills * self.chunk, self.chunk),
+        }